@@ -0,0 +1,272 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+import degrees
+from costars import MODES as COSTAR_MODES
+from util import Node, QueueFrontier, StackFrontier
+
+
+def benchmark_engines(pairs):
+    """
+    Runs every search engine over the same (source, target) pairs and
+    prints the total people expanded and wall time of each.
+    """
+    print(f"{'engine':<15}{'expanded':>12}{'seconds':>12}{'found':>8}")
+    for engine in sorted(degrees.ENGINES):
+        expanded = 0
+        found = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            stats = {}
+            path = degrees.shortest_path(source, target, engine=engine,
+                                         stats=stats)
+            expanded += stats["explored"]
+            if path is not None:
+                found += 1
+        elapsed = time.perf_counter() - start
+        print(f"{engine:<15}{expanded:>12}{elapsed:>12.4f}{found:>8}")
+
+
+def random_pairs(count, seed):
+    """
+    Returns `count` random (source, target) pairs of distinct people.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [tuple(rng.sample(person_ids, 2)) for _ in range(count)]
+
+
+def benchmark_backends(directory, backends, cache, workers=None):
+    """
+    Prints load time and retained memory of each storage backend.
+    Memory is measured in a separate load so tracing does not skew time.
+    With `cache`, the snapshot is written first so every timed load is
+    served from it. With `workers`, the CSV files are parsed in parallel.
+    """
+    if cache:
+        degrees.load_data(directory, cache=True)
+    print(f"{'backend':<15}{'seconds':>12}{'retained MB':>14}{'peak MB':>10}")
+    for backend in backends:
+        degrees.clear_data()
+        start = time.perf_counter()
+        degrees.load_data(directory, backend=backend, cache=cache,
+                          workers=workers)
+        elapsed = time.perf_counter() - start
+
+        degrees.clear_data()
+        tracemalloc.start()
+        degrees.load_data(directory, backend=backend, cache=cache,
+                          workers=workers)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{backend:<15}{elapsed:>12.4f}"
+              f"{retained / 2 ** 20:>14.2f}{peak / 2 ** 20:>10.2f}")
+    degrees.clear_data()
+
+
+def benchmark_oracle(pairs, k):
+    """
+    Compares landmark bounds and the bounded exact search against
+    shortest_path for accuracy and per-query latency.
+    """
+    start = time.perf_counter()
+    oracle = degrees.build_oracle(k)
+    print(f"Built oracle with {k} landmarks "
+          f"in {time.perf_counter() - start:.4f}s")
+
+    exact = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        exact.append(degrees.shortest_path(source, target))
+    search_time = time.perf_counter() - start
+
+    bounds = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        bounds.append(oracle.bounds(source, target))
+    bounds_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for source, target in pairs:
+        oracle.exact(source, target)
+    oracle_time = time.perf_counter() - start
+
+    # Accuracy of the bounds on connected pairs
+    tight = 0
+    gap = 0
+    connected = 0
+    for path, (lower, upper) in zip(exact, bounds):
+        if path is None:
+            continue
+        connected += 1
+        tight += lower == upper
+        gap += upper - lower
+    count = len(pairs)
+    print(f"{'method':<15}{'ms/query':>12}")
+    print(f"{'shortest_path':<15}{1000 * search_time / count:>12.4f}")
+    print(f"{'bounds':<15}{1000 * bounds_time / count:>12.4f}")
+    print(f"{'oracle.exact':<15}{1000 * oracle_time / count:>12.4f}")
+    if connected:
+        print(f"Exact bounds on {tight}/{connected} connected pairs, "
+              f"mean gap {gap / connected:.2f} degrees")
+
+
+def benchmark_costars(pairs, capacity):
+    """
+    Runs the same queries with the co-star index off, lazy and eager,
+    printing time, index memory and cache counters for each mode.
+    """
+    print(f"{'mode':<8}{'setup (s)':>11}{'query (s)':>11}{'index MB':>10}"
+          f"{'hits':>10}{'misses':>10}{'evicted':>10}")
+    for mode in COSTAR_MODES:
+        start = time.perf_counter()
+        degrees.set_costar_index(mode, capacity)
+        setup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for source, target in pairs:
+            degrees.shortest_path(source, target, engine="bidirectional")
+        elapsed = time.perf_counter() - start
+
+        if degrees.costars is None:
+            print(f"{mode:<8}{setup:>11.4f}{elapsed:>11.4f}{'-':>10}"
+                  f"{'-':>10}{'-':>10}{'-':>10}")
+            continue
+        report = degrees.costars.report()
+        print(f"{mode:<8}{setup:>11.4f}{elapsed:>11.4f}"
+              f"{report['bytes'] / 2 ** 20:>10.2f}{report['hits']:>10}"
+              f"{report['misses']:>10}{report['evictions']:>10}")
+    degrees.set_costar_index("off")
+
+
+class ListStackFrontier():
+    """
+    The original list-backed frontier, kept for comparison.
+    """
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def time_frontier(frontier, size):
+    """
+    Adds `size` nodes to the frontier, checking membership before each
+    add as the searches do, then removes them all. Returns seconds taken.
+    """
+    start = time.perf_counter()
+    for state in range(size):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def benchmark_frontiers(sizes, list_limit):
+    """
+    Prints how the deque-backed and list-backed frontiers scale.
+    List-backed frontiers are quadratic, so they are skipped for sizes
+    above `list_limit`.
+    """
+    kinds = [
+        ("StackFrontier", StackFrontier, ListStackFrontier),
+        ("QueueFrontier", QueueFrontier, ListQueueFrontier),
+    ]
+    print(f"{'frontier':<15}{'size':>10}{'deque (s)':>12}{'list (s)':>12}")
+    for name, fast, slow in kinds:
+        for size in sizes:
+            fast_time = f"{time_frontier(fast(), size):.4f}"
+            if size <= list_limit:
+                slow_time = f"{time_frontier(slow(), size):.4f}"
+            else:
+                slow_time = "-"
+            print(f"{name:<15}{size:>10}{fast_time:>12}{slow_time:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees searches")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="compare search engines")
+    search.add_argument("directory", nargs="?", default="large")
+    search.add_argument("--queries", type=int, default=100)
+    search.add_argument("--seed", type=int, default=0)
+    search.add_argument("--backend", choices=degrees.BACKENDS, default="dict")
+
+    oracle = commands.add_parser("oracle", help="evaluate landmark oracle")
+    oracle.add_argument("directory", nargs="?", default="large")
+    oracle.add_argument("--queries", type=int, default=100)
+    oracle.add_argument("--seed", type=int, default=0)
+    oracle.add_argument("--landmarks", type=int, default=16)
+    oracle.add_argument("--backend", choices=degrees.BACKENDS, default="dict")
+
+    costar = commands.add_parser("costar", help="compare co-star indexes")
+    costar.add_argument("directory", nargs="?", default="large")
+    costar.add_argument("--queries", type=int, default=100)
+    costar.add_argument("--seed", type=int, default=0)
+    costar.add_argument("--capacity", type=int, default=100000)
+    costar.add_argument("--backend", choices=degrees.BACKENDS, default="dict")
+
+    load = commands.add_parser("load", help="compare storage backends")
+    load.add_argument("directory", nargs="?", default="large")
+    load.add_argument("--backends", nargs="+", choices=degrees.BACKENDS,
+                      default=degrees.BACKENDS)
+    load.add_argument("--cache", action="store_true",
+                      help="load from the binary snapshot")
+    load.add_argument("--workers", type=int,
+                      help="processes parsing the CSV files in parallel")
+
+    frontier = commands.add_parser("frontier", help="compare frontiers")
+    frontier.add_argument("--sizes", type=int, nargs="+",
+                          default=[1000, 10000, 100000, 1000000])
+    frontier.add_argument("--list-limit", type=int, default=10000)
+
+    args = parser.parse_args()
+
+    if args.command == "frontier":
+        benchmark_frontiers(args.sizes, args.list_limit)
+        return
+    if args.command == "load":
+        benchmark_backends(args.directory, args.backends, args.cache,
+                           args.workers)
+        return
+
+    print("Loading data...")
+    degrees.load_data(args.directory, backend=args.backend)
+    print("Data loaded.")
+
+    pairs = random_pairs(args.queries, args.seed)
+    if args.command == "oracle":
+        benchmark_oracle(pairs, args.landmarks)
+    elif args.command == "costar":
+        benchmark_costars(pairs, args.capacity)
+    else:
+        benchmark_engines(pairs)
+
+
+if __name__ == "__main__":
+    main()
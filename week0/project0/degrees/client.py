@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import json
+import sys
+
+
+async def request(messages, host="127.0.0.1", port=8765):
+    """
+    Sends request objects to a degrees server over one connection and
+    returns the response objects in order.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    responses = []
+    try:
+        for message in messages:
+            writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Send JSON-line requests from stdin to a degrees server"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    messages = [json.loads(line) for line in sys.stdin if line.strip()]
+    for response in asyncio.run(request(messages, args.host, args.port)):
+        print(json.dumps(response))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import sys
+import time
+from collections import OrderedDict
+
+MODES = ["off", "lazy", "eager"]
+
+
+class CoStarIndex():
+    """
+    Caches each person's deduplicated co-stars along with one
+    representative movie per co-star.
+
+    In "lazy" mode entries are built on first use and the least recently
+    used are evicted beyond `capacity` people. In "eager" mode every
+    person in `person_ids` is indexed up front and nothing is evicted.
+    """
+
+    def __init__(self, neighbors, mode="lazy", capacity=100000,
+                 person_ids=()):
+        """
+        `neighbors` is a function returning (movie_id, person_id) pairs
+        for a person, such as degrees.neighbors_from_stars.
+        """
+        if mode not in ("lazy", "eager"):
+            raise ValueError(f"unknown co-star index mode: {mode}")
+        self.neighbors = neighbors
+        self.mode = mode
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+        # Instrumentation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+
+        if mode == "eager":
+            for person_id in person_ids:
+                self.entries[person_id] = self.build(person_id)
+
+    def build(self, person_id):
+        """
+        Returns (co-star person_ids, movie_ids) tuples for a person.
+        """
+        start = time.perf_counter()
+        costars = {}
+        for movie_id, costar_id in self.neighbors(person_id):
+            if costar_id != person_id and costar_id not in costars:
+                costars[costar_id] = movie_id
+        entry = (tuple(costars), tuple(costars.values()))
+        self.build_seconds += time.perf_counter() - start
+        return entry
+
+    def get(self, person_id):
+        """
+        Returns (co-star person_ids, movie_ids) tuples for a person,
+        where movie_ids[i] is a movie shared with co-star person_ids[i].
+        """
+        entry = self.entries.get(person_id)
+        if entry is not None:
+            self.hits += 1
+            if self.mode == "lazy":
+                self.entries.move_to_end(person_id)
+            return entry
+
+        self.misses += 1
+        entry = self.build(person_id)
+        if self.mode == "lazy":
+            self.entries[person_id] = entry
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def pairs(self, person_id):
+        """
+        Returns an iterator of (movie_id, person_id) pairs for a
+        person's co-stars, one pair per co-star.
+        """
+        costar_ids, movie_ids = self.get(person_id)
+        return zip(movie_ids, costar_ids)
+
+    def nbytes(self):
+        """
+        Returns the approximate size in bytes of the index itself,
+        not counting the id strings it shares with the dataset.
+        """
+        size = sys.getsizeof(self.entries)
+        for costar_ids, movie_ids in self.entries.values():
+            size += sys.getsizeof(costar_ids) + sys.getsizeof(movie_ids)
+        return size
+
+    def report(self):
+        """
+        Returns a dict of the index's counters.
+        """
+        return {
+            "mode": self.mode,
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "build_seconds": self.build_seconds,
+            "bytes": self.nbytes(),
+        }
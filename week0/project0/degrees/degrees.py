@@ -1,6 +1,19 @@
+import argparse
 import csv
+import functools
+import itertools
+import json
+import multiprocessing
+import os
 import sys
+import time
 
+import ingest
+import snapshot
+from costars import CoStarIndex, MODES as COSTAR_MODES
+from graph import CompactGraph
+from landmarks import LandmarkOracle
+from nameindex import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,84 +25,425 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding the star graph when loaded with the compact backend,
+# in which case people and movies keep no movies/stars sets
+graph = None
 
-def load_data(directory):
+# NameIndex over the keys of names, built by load_data
+name_index = None
+
+# CoStarIndex answering neighbors_for_person, if enabled
+costars = None
+
+BACKENDS = ["dict", "compact"]
+
+
+def load_data(directory, backend="dict", cache=False, workers=None):
     """
     Load data from CSV files into memory.
+
+    The "dict" backend stores stars as sets inside people and movies.
+    The "compact" backend stores them in a CompactGraph instead.
+
+    With `cache`, a binary snapshot is written next to the CSV files on
+    the first load and memory-mapped on later loads, for as long as the
+    CSV files keep the same size and modification time. A snapshot that
+    is truncated or corrupt is ignored and rewritten.
+
+    With `workers`, the CSV files are parsed in chunks by that many
+    processes (see ingest.py) instead of row by row in this one.
+
+    Returns a report of the rows loaded, the rows with missing fields
+    ("invalid", per file) and the stars rows dropped for naming an
+    unknown person or movie ("dropped").
+    """
+    global graph, name_index
+    compact = backend == "compact"
+    report = {
+        "people": 0,
+        "movies": 0,
+        "stars": 0,
+        "invalid": {filename: 0 for filename in ingest.COLUMNS},
+        "dropped": {"unknown_person": 0, "unknown_movie": 0}
+    }
+
+    if cache:
+        path = os.path.join(directory, snapshot.FILENAME)
+        stamps = snapshot.source_stamps(directory)
+        loaded = snapshot.read_snapshot(path, stamps)
+        if loaded is not None:
+            load_snapshot(*loaded, compact)
+            name_index = NameIndex(names)
+            report["people"] = len(people)
+            report["movies"] = len(movies)
+            report["stars"] = len(loaded[0].person_movies)
+            return report
+
+    if workers:
+        load_columns(directory, compact, workers, report)
+    else:
+        load_rows(directory, compact, report)
+
+    if cache:
+        if compact:
+            snapshot_graph = graph
+        else:
+            pairs = (
+                (person_id, movie_id)
+                for person_id, person in people.items()
+                for movie_id in person["movies"]
+            )
+            snapshot_graph = CompactGraph.from_pairs(
+                list(people), list(movies), pairs
+            )
+        snapshot.write_snapshot(path, stamps, snapshot_graph, people, movies)
+
+    name_index = NameIndex(names)
+    report["people"] = len(people)
+    report["movies"] = len(movies)
+    return report
+
+
+def load_rows(directory, compact, report):
+    """
+    Loads the CSV files one row at a time with csv.DictReader.
     """
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            if None in row.values():
+                report["invalid"]["people.csv"] += 1
+                continue
+            add_person(row["id"], row["name"], row["birth"], compact)
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+            if None in row.values():
+                report["invalid"]["movies.csv"] += 1
+                continue
+            add_movie(row["id"], row["title"], row["year"], compact)
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+
+        def star_pairs():
+            for row in reader:
+                if None in row.values():
+                    report["invalid"]["stars.csv"] += 1
+                    continue
+                yield row["person_id"], row["movie_id"]
+
+        add_stars(star_pairs(), compact, report)
+
+
+def load_columns(directory, compact, workers, report):
+    """
+    Loads the CSV files from columnar chunks parsed in parallel.
+    """
+    def star_pairs(chunks):
+        # Chunks arrive file by file, so people and movies are complete
+        # before the first stars pair is yielded
+        for filename, columns, invalid in chunks:
+            report["invalid"][filename] += invalid
+            if filename == "people.csv":
+                for person_id, name, birth in zip(*columns):
+                    add_person(person_id, name, birth, compact)
+            elif filename == "movies.csv":
+                for movie_id, title, year in zip(*columns):
+                    add_movie(movie_id, title, year, compact)
+            else:
+                yield from zip(*columns)
+
+    add_stars(star_pairs(ingest.read_columns(directory, workers)),
+              compact, report)
+
+
+def add_person(person_id, name, birth, compact):
+    """
+    Adds one row of people.csv to people and names.
+    """
+    people[person_id] = {
+        "name": name,
+        "birth": birth
+    }
+    if not compact:
+        people[person_id]["movies"] = set()
+    if name.lower() not in names:
+        names[name.lower()] = {person_id}
+    else:
+        names[name.lower()].add(person_id)
+
+
+def add_movie(movie_id, title, year, compact):
+    """
+    Adds one row of movies.csv to movies.
+    """
+    movies[movie_id] = {
+        "title": title,
+        "year": year
+    }
+    if not compact:
+        movies[movie_id]["stars"] = set()
+
+
+def add_stars(pairs, compact, report):
+    """
+    Adds (person_id, movie_id) rows of stars.csv to the star graph,
+    counting rows that name an unknown person or movie in report.
+    """
+    global graph
+
+    def known_pairs():
+        for person_id, movie_id in pairs:
+            if person_id not in people:
+                report["dropped"]["unknown_person"] += 1
+            elif movie_id not in movies:
+                report["dropped"]["unknown_movie"] += 1
+            else:
+                report["stars"] += 1
+                yield person_id, movie_id
+
+    if compact:
+        # Pairs may stream in while people and movies are still loading
+        known = list(known_pairs())
+        graph = CompactGraph.from_pairs(list(people), list(movies), known)
+    else:
+        for person_id, movie_id in known_pairs():
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+
+
+def load_snapshot(snapshot_graph, person_rows, movie_rows, compact):
+    """
+    Fills names, people and movies (and graph, if compact) from a
+    snapshot returned by snapshot.read_snapshot.
+
+    Every dict is rebuilt, and with the dict backend every stars set
+    too, so this is linear in the dataset; it only skips the CSV
+    parsing.
+    """
+    global graph
+    person_ids = snapshot_graph.person_ids
+    movie_ids = snapshot_graph.movie_ids
+
+    for i, (name, birth) in enumerate(person_rows):
+        person_id = person_ids[i]
+        people[person_id] = {"name": name, "birth": birth}
+        if not compact:
+            people[person_id]["movies"] = {
+                movie_ids[m] for m in snapshot_graph.movies_for(i)
+            }
+        names.setdefault(name.lower(), set()).add(person_id)
+
+    for i, (title, year) in enumerate(movie_rows):
+        movie_id = movie_ids[i]
+        movies[movie_id] = {"title": title, "year": year}
+        if not compact:
+            movies[movie_id]["stars"] = {
+                person_ids[p] for p in snapshot_graph.stars_for(i)
+            }
+
+    if compact:
+        graph = snapshot_graph
+
+
+def clear_data():
+    """
+    Forget any previously loaded data.
+    """
+    global graph, costars, name_index
+    names.clear()
+    people.clear()
+    movies.clear()
+    graph = None
+    costars = None
+    name_index = None
+
+
+def set_costar_index(mode, capacity=100000):
+    """
+    Enables a CoStarIndex over the loaded data in "lazy" or "eager"
+    mode, or disables it with "off".
+    """
+    global costars
+    if mode == "off":
+        costars = None
+    else:
+        costars = CoStarIndex(neighbors_from_stars, mode=mode,
+                              capacity=capacity, person_ids=people)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Degrees of separation")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="bfs",
+                        help="search engine used to find the path")
+    parser.add_argument("--backend", choices=BACKENDS, default="dict",
+                        help="in-memory representation of the star graph")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse a binary snapshot of the CSV files")
+    parser.add_argument("--batch", metavar="QUERIES",
+                        help="answer a CSV of source,target person ids")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv",
+                        help="output format of --batch results")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes answering --batch queries")
+    parser.add_argument("--costar-index", choices=COSTAR_MODES, default="off",
+                        help="cache deduplicated co-stars per person")
+    parser.add_argument("--costar-capacity", type=int, default=100000,
+                        help="people kept by the lazy co-star index")
+    parser.add_argument("--resolve", choices=["ask", "prolific"],
+                        default="ask",
+                        help="how to pick between people sharing a name")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="fall back to the closest name if none match")
+    parser.add_argument("--max-degrees", type=int,
+                        help="give up on paths longer than this")
+    parser.add_argument("--time-budget", type=float,
+                        help="give up after this many seconds (per source "
+                        "with --batch)")
+    parser.add_argument("--load-workers", type=int,
+                        help="processes parsing the CSV files in parallel")
+    parser.add_argument("--paths", type=int, nargs="?", const=0,
+                        metavar="K",
+                        help="list every shortest path, or the first K; "
+                        "newest movies nearest the target come first")
+    parser.add_argument("--min-year", type=int,
+                        help="only follow movies from this year on (--paths)")
+    parser.add_argument("--max-year", type=int,
+                        help="only follow movies up to this year (--paths)")
+    args = parser.parse_args()
+    directory = args.directory
+
+    # Keep stdout clean for batch results
+    log = sys.stderr if args.batch else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    report = load_data(directory, backend=args.backend, cache=args.cache,
+                       workers=args.load_workers)
+    print("Data loaded.", file=log)
+    skipped = sum(report["invalid"].values()) + sum(report["dropped"].values())
+    if skipped:
+        print(f"Skipped {skipped} invalid or unmatched rows.", file=log)
+    set_costar_index(args.costar_index, args.costar_capacity)
 
-    source = person_id_for_name(input("Name: "))
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as f:
+            queries = read_queries(f)
+        unknown = sum(1 for source, target in queries
+                      if source not in people or target not in people)
+        if unknown:
+            print(f"{unknown} queries name unknown person ids; "
+                  "reported as not connected.", file=log)
+        loader = (directory, args.backend, args.cache)
+        stats = {}
+        results = run_batch(queries, workers=args.workers, loader=loader,
+                            max_degrees=args.max_degrees,
+                            time_budget=args.time_budget, stats=stats)
+        write_results(results, sys.stdout, args.format)
+        for limit, searches in stats["stopped_by"].items():
+            if searches:
+                print(f"{searches} searches stopped by {limit} limit "
+                      f"({stats['explored']} people expanded in all); "
+                      "targets they missed are reported as not "
+                      "connected.", file=log)
+        return
+
+    source = person_id_for_name(input("Name: "), args.resolve, args.fuzzy)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), args.resolve, args.fuzzy)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.paths is not None:
+        stats = {}
+        paths = all_shortest_paths(source, target, min_year=args.min_year,
+                                   max_year=args.max_year,
+                                   max_degrees=args.max_degrees,
+                                   time_budget=args.time_budget, stats=stats)
+        if args.paths:
+            paths = itertools.islice(paths, args.paths)
+        count = 0
+        for count, path in enumerate(paths, 1):
+            print(f"Path {count}:")
+            print_path(source, path)
+        if stats["stopped_by"] is not None and count == 0:
+            print(f"Not connected within {stats['stopped_by']} limit "
+                  f"({stats['explored']} people expanded).")
+        elif stats["stopped_by"] is not None:
+            print(f"Stopped by {stats['stopped_by']} limit after "
+                  f"{count} paths.")
+        elif count == 0:
+            print("Not connected.")
+        return
+
+    stats = {}
+    path = shortest_path(source, target, engine=args.engine, stats=stats,
+                         max_degrees=args.max_degrees,
+                         time_budget=args.time_budget)
 
-    if path is None:
+    if path is None and stats["stopped_by"] is not None:
+        print(f"Not connected within {stats['stopped_by']} limit "
+              f"({stats['explored']} people expanded).")
+    elif path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    """
+    Prints a (movie_id, person_id) path starting at source.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, engine="bfs", stats=None,
+                  max_degrees=None, time_budget=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
-    If no possible path, returns None.
+    If no possible path, returns None. A person is connected to
+    themselves by the empty path, whatever the engine.
+
+    `engine` picks the search used (see ENGINES). If `stats` is a dict,
+    it is filled in with the number of people expanded ("explored") and
+    the limit that stopped the search early ("stopped_by"), if any.
+
+    The search gives up, returning None, once every path left would be
+    longer than `max_degrees` ("max_degrees") or after `time_budget`
+    seconds ("time_budget").
+    """
+    if stats is None:
+        stats = {}
+    stats["stopped_by"] = None
+    if source == target:
+        stats["explored"] = 0
+        return []
+    deadline = None
+    if time_budget is not None:
+        deadline = time.perf_counter() + time_budget
+    return ENGINES[engine](source, target, stats, max_degrees, deadline)
+
+
+def breadth_first_path(source, target, stats, max_degrees=None,
+                       deadline=None):
+    """
+    One-sided breadth-first search from source using a QueueFrontier.
     """
     # Initialize starting point, frontier and explored_set
     start = Node(state=source, parent=None, action=None)
@@ -97,6 +451,10 @@ def shortest_path(source, target):
     frontier.add(start)
 
     explored = set()
+    stats["explored"] = 0
+
+    # Number of degrees from source to each person added to the frontier
+    depth = {source: 0}
 
     while True:
 
@@ -106,15 +464,26 @@ def shortest_path(source, target):
         
         # Remove a node from the frontier
         node = frontier.remove()
+
+        # Nodes come out in depth order, so every child from here on
+        # would be too far away
+        if max_degrees is not None and depth[node.state] >= max_degrees:
+            stats["stopped_by"] = "max_degrees"
+            return None
+        if deadline is not None and time.perf_counter() > deadline:
+            stats["stopped_by"] = "time_budget"
+            return None
         
         # # Mark node as explored
         explored.add(node.state)
+        stats["explored"] = len(explored)
 
         # Add neighbour to frontier/ expand the node
         for action, state in neighbors_for_person(node.state):
 
             if state not in explored and not frontier.contains_state(state):
                 child = Node(state=state, parent=node, action=action)
+                depth[state] = depth[node.state] + 1
 
                 if child.state == target:
                     solution = []
@@ -126,14 +495,389 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
-def person_id_for_name(name):
+def bidirectional_path(source, target, stats, max_degrees=None,
+                       deadline=None):
+    """
+    Breadth-first search from both source and target at once.
+
+    Each step expands one full layer of whichever frontier is smaller.
+    Once a layer reaches a person already seen from the other side, the
+    two parent chains are joined at the meeting person with the lowest
+    combined distance.
+    """
+    stats["explored"] = 0
+
+    # Maps person_id to (movie_id, person_id) one step closer to that side's
+    # root, or None for the root itself
+    forward = {source: None}
+    backward = {target: None}
+
+    # Distance of each seen person from that side's root
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+
+    forward_layer = [source]
+    backward_layer = [target]
+
+    # Depth of the current layer on each side
+    forward_level = 0
+    backward_level = 0
+
+    while forward_layer and backward_layer:
+
+        # The next layer can only find paths of this many degrees
+        if max_degrees is not None:
+            if forward_level + backward_level + 1 > max_degrees:
+                stats["stopped_by"] = "max_degrees"
+                return None
+
+        # Always grow the cheaper side
+        if len(forward_layer) <= len(backward_layer):
+            parents, depth, layer = forward, forward_depth, forward_layer
+            other_depth = backward_depth
+        else:
+            parents, depth, layer = backward, backward_depth, backward_layer
+            other_depth = forward_depth
+
+        next_layer = []
+        meeting = None
+        best = None
+        for person_id in layer:
+            if deadline is not None and time.perf_counter() > deadline:
+                stats["stopped_by"] = "time_budget"
+                return None
+            stats["explored"] += 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in depth:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+                depth[neighbor_id] = depth[person_id] + 1
+                next_layer.append(neighbor_id)
+                if neighbor_id in other_depth:
+                    total = depth[neighbor_id] + other_depth[neighbor_id]
+                    if best is None or total < best:
+                        best = total
+                        meeting = neighbor_id
+
+        if meeting is not None:
+            return join_paths(forward, backward, meeting)
+
+        if parents is forward:
+            forward_layer = next_layer
+            forward_level += 1
+        else:
+            backward_layer = next_layer
+            backward_level += 1
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Builds the (movie_id, person_id) path through `meeting` from the
+    parent maps of a bidirectional search.
+    """
+    # Walk back from the meeting person to the source
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    # Walk on from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, next_id = backward[person_id]
+        path.append((movie_id, next_id))
+        person_id = next_id
+    return path
+
+
+def all_shortest_paths(source, target, min_year=None, max_year=None,
+                       max_degrees=None, time_budget=None, stats=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, lazily and without repeats.
+
+    Only movies released between `min_year` and `max_year` (inclusive,
+    when given) are used, so the paths are the shortest ones through
+    those movies. Every movie two people share is followed, not just
+    the one the costar index keeps. Paths are ordered by their steps
+    from the target backwards, newest movie first at each step.
+
+    `max_degrees`, `time_budget` and `stats` work as in shortest_path.
+    The time budget covers the search and the paths yielded; once it
+    runs out, no more paths are yielded.
+    """
+    if stats is None:
+        stats = {}
+    stats["stopped_by"] = None
+    stats["explored"] = 0
+    if source == target:
+        yield []
+        return
+    deadline = None
+    if time_budget is not None:
+        deadline = time.perf_counter() + time_budget
+
+    def allowed(movie_id):
+        if min_year is None and max_year is None:
+            return True
+        try:
+            year = int(movies[movie_id]["year"])
+        except ValueError:
+            return False
+        return ((min_year is None or year >= min_year)
+                and (max_year is None or year <= max_year))
+
+    # BFS that records, for each person, every (movie_id, person_id)
+    # reaching them from the previous layer
+    depth = {source: 0}
+    predecessors = {}
+    layer = [source]
+    while layer and target not in depth:
+        if max_degrees is not None and depth[layer[0]] >= max_degrees:
+            stats["stopped_by"] = "max_degrees"
+            return
+        next_layer = []
+        for person_id in layer:
+            if deadline is not None and time.perf_counter() > deadline:
+                stats["stopped_by"] = "time_budget"
+                return
+            stats["explored"] += 1
+            for movie_id, neighbor_id in neighbors_from_stars(person_id):
+                if not allowed(movie_id):
+                    continue
+                if neighbor_id not in depth:
+                    depth[neighbor_id] = depth[person_id] + 1
+                    predecessors[neighbor_id] = []
+                    next_layer.append(neighbor_id)
+                if depth[neighbor_id] == depth[person_id] + 1:
+                    predecessors[neighbor_id].append((movie_id, person_id))
+        layer = next_layer
+
+    if target not in depth:
+        return
+
+    def recency(step):
+        year = movies[step[0]]["year"]
+        return -int(year) if year.isdigit() else 0
+
+    for steps in predecessors.values():
+        steps.sort(key=recency)
+
+    # Walk predecessor lists back from the target, depth first
+    stack = [(target, [], 0)]
+    while stack:
+        if deadline is not None and time.perf_counter() > deadline:
+            stats["stopped_by"] = "time_budget"
+            return
+        person_id, suffix, choice = stack.pop()
+        if person_id == source:
+            yield suffix
+            continue
+        steps = predecessors[person_id]
+        if choice + 1 < len(steps):
+            stack.append((person_id, suffix, choice + 1))
+        movie_id, parent_id = steps[choice]
+        stack.append((parent_id, [(movie_id, person_id)] + suffix, 0))
+
+
+def paths_from(source, targets, max_degrees=None, time_budget=None,
+               stats=None):
+    """
+    Runs a single breadth-first search from source and returns a dict
+    mapping each of `targets` to its shortest (movie_id, person_id)
+    path, or None if it is not connected to source. Ids not in the
+    dataset are not connected to anyone.
+
+    The search stops as soon as every target has been reached. Like
+    shortest_path, it also gives up once every path left would be
+    longer than `max_degrees` or after `time_budget` seconds, filling
+    in `stats`; targets reached by then keep their paths.
+    """
+    if stats is None:
+        stats = {}
+    stats["stopped_by"] = None
+    stats["explored"] = 0
+    if source not in people:
+        return {target: None for target in targets}
+    deadline = None
+    if time_budget is not None:
+        deadline = time.perf_counter() + time_budget
+
+    # Maps person_id to the (movie_id, person_id) it was reached from
+    parents = {source: None}
+    remaining = set(targets) - {source}
+    layer = [source]
+    depth = 0
+
+    while layer and remaining and stats["stopped_by"] is None:
+        if max_degrees is not None and depth >= max_degrees:
+            stats["stopped_by"] = "max_degrees"
+            break
+        depth += 1
+        next_layer = []
+        for person_id in layer:
+            if deadline is not None and time.perf_counter() > deadline:
+                stats["stopped_by"] = "time_budget"
+                break
+            stats["explored"] += 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id not in parents:
+                    parents[neighbor_id] = (movie_id, person_id)
+                    next_layer.append(neighbor_id)
+                    remaining.discard(neighbor_id)
+        layer = next_layer
+
+    paths = {}
+    for target in targets:
+        if target not in parents:
+            paths[target] = None
+            continue
+        path = []
+        person_id = target
+        while parents[person_id] is not None:
+            movie_id, parent_id = parents[person_id]
+            path.append((movie_id, person_id))
+            person_id = parent_id
+        path.reverse()
+        paths[target] = path
+    return paths
+
+
+def read_queries(f):
+    """
+    Reads (source, target) person id pairs from a CSV file object with
+    source and target columns.
+    """
+    return [(row["source"], row["target"]) for row in csv.DictReader(f)]
+
+
+def run_batch(queries, workers=1, loader=None, max_degrees=None,
+              time_budget=None, stats=None):
+    """
+    Answers (source, target) queries with one search per distinct source.
+
+    Yields (source, target, path) tuples, grouped by source. With more
+    than one worker, sources are sharded across a process pool; each
+    worker calls load_data(*loader) first unless it inherited the data.
+    Paths longer than `max_degrees`, paths not found within
+    `time_budget` seconds of their source's search, and queries naming
+    a person id that is not in the dataset are reported as not
+    connected.
+
+    If `stats` is a dict, it is filled in as results are yielded with
+    the people expanded by every search ("explored") and the number of
+    searches each limit cut short ("stopped_by").
+    """
+    if stats is None:
+        stats = {}
+    stats["explored"] = 0
+    stats["stopped_by"] = {"max_degrees": 0, "time_budget": 0}
+    answer = functools.partial(answer_group, max_degrees=max_degrees,
+                               time_budget=time_budget)
+    groups = {}
+    for source, target in queries:
+        groups.setdefault(source, []).append(target)
+
+    if workers <= 1:
+        answered = map(answer, groups.items())
+        for group, group_stats in answered:
+            add_stats(stats, group_stats)
+            yield from group
+        return
+
+    with multiprocessing.Pool(workers, initializer=init_worker,
+                              initargs=(loader,)) as pool:
+        answered = pool.imap_unordered(answer, groups.items())
+        for group, group_stats in answered:
+            add_stats(stats, group_stats)
+            yield from group
+
+
+def add_stats(totals, stats):
+    """
+    Adds the stats of one paths_from search to run_batch's totals.
+    """
+    totals["explored"] += stats["explored"]
+    if stats["stopped_by"] is not None:
+        totals["stopped_by"][stats["stopped_by"]] += 1
+
+
+def init_worker(loader):
+    """
+    Loads the dataset in a batch worker that did not inherit it.
+    """
+    if not people and loader is not None:
+        directory, backend, cache = loader
+        load_data(directory, backend=backend, cache=cache)
+
+
+def answer_group(group, max_degrees=None, time_budget=None):
+    """
+    Answers every target of one source; used by run_batch.
+
+    Returns the (source, target, path) results and the search's stats.
+    """
+    source, targets = group
+    stats = {}
+    paths = paths_from(source, targets, max_degrees, time_budget, stats)
+    return [(source, target, paths[target]) for target in targets], stats
+
+
+def write_results(results, f, fmt="csv"):
+    """
+    Streams (source, target, path) results to a file object as CSV or
+    JSON lines. Unconnected pairs have an empty degrees field (CSV) or a
+    null path (JSON lines).
+    """
+    if fmt == "jsonl":
+        for source, target, path in results:
+            f.write(json.dumps({
+                "source": source,
+                "target": target,
+                "degrees": None if path is None else len(path),
+                "path": path
+            }) + "\n")
+        return
+
+    writer = csv.writer(f)
+    writer.writerow(["source", "target", "degrees", "path"])
+    for source, target, path in results:
+        if path is None:
+            writer.writerow([source, target, "", ""])
+        else:
+            steps = ";".join(f"{movie_id}:{person_id}"
+                             for movie_id, person_id in path)
+            writer.writerow([source, target, len(path), steps])
+
+
+def person_id_for_name(name, policy="ask", fuzzy=False):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    `policy` decides what happens when several people share the name:
+    "ask" prompts for the intended id, "prolific" picks whoever starred
+    in the most movies and "all" returns a sorted list of every
+    candidate id instead of a single id. With `fuzzy`, a name with no
+    exact match falls back to the closest name in name_index.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if not person_ids and fuzzy and name_index is not None:
+        matches = name_index.fuzzy(name, limit=1)
+        if matches:
+            person_ids = list(names[matches[0][1]])
+
+    if policy == "all":
+        return sorted(person_ids)
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and policy == "prolific":
+        return max(sorted(person_ids), key=movie_count)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -156,7 +900,28 @@ def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    With a co-star index enabled, each co-star appears once and the
+    person themselves is left out.
     """
+    if costars is not None:
+        return costars.pairs(person_id)
+    return neighbors_from_stars(person_id)
+
+
+def neighbors_from_stars(person_id):
+    """
+    Returns (movie_id, person_id) pairs for people who starred with a
+    given person, walking the cast of each of their movies.
+    """
+    if graph is not None:
+        movie_ids = graph.movie_ids
+        person_ids = graph.person_ids
+        return {
+            (movie_ids[m], person_ids[q])
+            for m, q in graph.neighbors(graph.person_index[person_id])
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -165,5 +930,30 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return len(graph.movies_for(graph.person_index[person_id]))
+    return len(people[person_id]["movies"])
+
+
+def build_oracle(k=16):
+    """
+    Returns a LandmarkOracle over the loaded data that uses the k people
+    who starred in the most movies as landmarks.
+    """
+    landmarks = sorted(people, key=movie_count, reverse=True)[:k]
+    return LandmarkOracle(list(people), neighbors_for_person, landmarks)
+
+
+# Search engines selectable through shortest_path(engine=...)
+ENGINES = {
+    "bfs": breadth_first_path,
+    "bidirectional": bidirectional_path,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,102 @@
+from array import array
+
+
+class CompactGraph():
+    """
+    Bipartite person/movie star graph stored as CSR arrays.
+
+    Person and movie ids are interned into dense integers. The movies of
+    person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are laid out the same way in movie_people.
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {pid: i for i, pid in enumerate(person_ids)}
+        self.movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Slicing a memoryview does not copy the underlying array
+        self._person_movies = memoryview(person_movies)
+        self._movie_people = memoryview(movie_people)
+
+    @classmethod
+    def from_pairs(cls, person_ids, movie_ids, pairs):
+        """
+        Builds the graph from lists of person and movie ids and an
+        iterable of (person_id, movie_id) star pairs. Duplicate pairs are
+        stored once; pairs with unknown ids must be filtered beforehand.
+        """
+        person_index = {pid: i for i, pid in enumerate(person_ids)}
+        movie_index = {mid: i for i, mid in enumerate(movie_ids)}
+
+        # Intern and deduplicate the edges
+        edges = set()
+        for person_id, movie_id in pairs:
+            edges.add((person_index[person_id], movie_index[movie_id]))
+
+        person_offsets = _offsets(len(person_ids), (p for p, _ in edges))
+        movie_offsets = _offsets(len(movie_ids), (m for _, m in edges))
+
+        # Place each edge into both adjacency arrays (counting sort)
+        person_movies = array("i", bytes(4 * len(edges)))
+        movie_people = array("i", bytes(4 * len(edges)))
+        person_next = array("i", person_offsets[:-1])
+        movie_next = array("i", movie_offsets[:-1])
+        for p, m in sorted(edges):
+            person_movies[person_next[p]] = m
+            person_next[p] += 1
+            movie_people[movie_next[m]] = p
+            movie_next[m] += 1
+
+        return cls(list(person_ids), list(movie_ids), person_offsets,
+                   person_movies, movie_offsets, movie_people)
+
+    def movies_for(self, p):
+        """
+        Returns a view of the movie indices person index p starred in.
+        """
+        offsets = self.person_offsets
+        return self._person_movies[offsets[p]:offsets[p + 1]]
+
+    def stars_for(self, m):
+        """
+        Returns a view of the person indices starring in movie index m.
+        """
+        offsets = self.movie_offsets
+        return self._movie_people[offsets[m]:offsets[m + 1]]
+
+    def neighbors(self, p):
+        """
+        Yields (movie index, person index) pairs for people who starred
+        with person index p, including p itself.
+        """
+        for m in self.movies_for(p):
+            for q in self.stars_for(m):
+                yield m, q
+
+    def nbytes(self):
+        """
+        Returns the size in bytes of the CSR arrays.
+        """
+        return sum(a.itemsize * len(a) for a in (
+            self.person_offsets, self.person_movies,
+            self.movie_offsets, self.movie_people
+        ))
+
+
+def _offsets(count, keys):
+    """
+    Returns CSR offsets for `count` rows given the row key of every edge.
+    """
+    offsets = array("i", bytes(4 * (count + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    return offsets
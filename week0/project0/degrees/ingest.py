@@ -0,0 +1,110 @@
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Columns kept from each CSV file, in order
+COLUMNS = {
+    "people.csv": ["id", "name", "birth"],
+    "movies.csv": ["id", "title", "year"],
+    "stars.csv": ["person_id", "movie_id"],
+}
+
+# Bytes of CSV parsed by one worker task
+CHUNK_SIZE = 1 << 22
+
+
+def chunk_ranges(path, chunk_size=CHUNK_SIZE):
+    """
+    Splits a CSV file, minus its header line, into (start, end) byte
+    ranges that each end on a line boundary.
+
+    Assumes no quoted field contains a newline, which holds for the
+    IMDb extracts degrees reads.
+    """
+    ranges = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def header(path):
+    """
+    Returns the column names in a CSV file's header line.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        return next(csv.reader(f))
+
+
+def parse_chunk(path, start, end, positions):
+    """
+    Parses rows in the byte range [start, end) of a CSV file.
+
+    Returns (columns, invalid) where columns holds one list per entry
+    of `positions` (the index of that field in each row) and invalid
+    counts rows with the wrong number of fields.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+
+    width = max(positions) + 1
+    columns = tuple([] for _ in positions)
+    invalid = 0
+    # Split rows the way csv does on a file opened with newline="", not
+    # on every character str.splitlines treats as a line break
+    for row in csv.reader(io.StringIO(text, newline="")):
+        # Skip blank lines, as csv.DictReader does
+        if not row:
+            continue
+        if len(row) < width:
+            invalid += 1
+            continue
+        for column, position in zip(columns, positions):
+            column.append(row[position])
+    return columns, invalid
+
+
+def read_columns(directory, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Parses people.csv, movies.csv and stars.csv in a process pool.
+
+    Yields (filename, columns, invalid) for every chunk, with all
+    chunks of a file coming before those of the next file and in file
+    order. At most two chunks per worker are parsed ahead of the
+    consumer, which bounds peak memory.
+    """
+    tasks = []
+    for filename, names in COLUMNS.items():
+        path = os.path.join(directory, filename)
+        fields = header(path)
+        positions = [fields.index(name) for name in names]
+        for start, end in chunk_ranges(path, chunk_size):
+            tasks.append((filename, path, start, end, positions))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = 2 * workers
+        pending = deque()
+        tasks = iter(tasks)
+        while True:
+            for filename, path, start, end, positions in tasks:
+                future = executor.submit(parse_chunk, path, start, end,
+                                         positions)
+                pending.append((filename, future))
+                if len(pending) >= window:
+                    break
+            if not pending:
+                return
+            filename, future = pending.popleft()
+            columns, invalid = future.result()
+            yield filename, columns, invalid
@@ -0,0 +1,129 @@
+import math
+import time
+from array import array
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkOracle():
+    """
+    Estimates degrees of separation from precomputed BFS distances.
+
+    For every landmark L, the triangle inequality gives
+    |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t).
+    """
+
+    def __init__(self, person_ids, neighbors, landmarks):
+        """
+        `person_ids` lists every person, `neighbors` is a function like
+        degrees.neighbors_for_person and `landmarks` are the person_ids
+        to run a BFS from.
+        """
+        self.neighbors = neighbors
+        self.landmarks = list(landmarks)
+        self.index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.distances = [self.distances_from(l) for l in self.landmarks]
+
+    def distances_from(self, landmark):
+        """
+        Returns an array of BFS distances from landmark to every person.
+        """
+        distances = array("H", [UNREACHABLE]) * len(self.index)
+        distances[self.index[landmark]] = 0
+        layer = [landmark]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for person_id in layer:
+                for _, neighbor_id in self.neighbors(person_id):
+                    i = self.index[neighbor_id]
+                    if distances[i] == UNREACHABLE:
+                        distances[i] = depth
+                        next_layer.append(neighbor_id)
+            layer = next_layer
+        return distances
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between source and
+        target. Both are math.inf if a landmark shows they are not
+        connected; upper is math.inf if no landmark reaches either.
+        """
+        s = self.index[source]
+        t = self.index[target]
+        lower = 0
+        upper = math.inf
+        for distances in self.distances:
+            ds = distances[s]
+            dt = distances[t]
+            if (ds == UNREACHABLE) != (dt == UNREACHABLE):
+                return math.inf, math.inf
+            if ds == UNREACHABLE:
+                continue
+            lower = max(lower, abs(ds - dt))
+            upper = min(upper, ds + dt)
+        return lower, upper
+
+    def exact(self, source, target, stats=None, max_degrees=None,
+              time_budget=None):
+        """
+        Returns the shortest (movie_id, person_id) path from source to
+        target, or None if they are not connected.
+
+        Runs a BFS from source that skips people whose depth plus their
+        lower bound to target exceeds the landmark upper bound. `stats`,
+        `max_degrees` and `time_budget` work as in degrees.shortest_path.
+        """
+        if stats is None:
+            stats = {}
+        stats["explored"] = 0
+        stats["stopped_by"] = None
+        deadline = None
+        if time_budget is not None:
+            deadline = time.perf_counter() + time_budget
+
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+        if source == target:
+            return []
+        if max_degrees is not None:
+            if lower > max_degrees:
+                stats["stopped_by"] = "max_degrees"
+                return None
+            upper = min(upper, max_degrees)
+
+        parents = {source: None}
+        layer = [source]
+        depth = 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for person_id in layer:
+                if deadline is not None and time.perf_counter() > deadline:
+                    stats["stopped_by"] = "time_budget"
+                    return None
+                stats["explored"] += 1
+                for movie_id, neighbor_id in self.neighbors(person_id):
+                    if neighbor_id in parents:
+                        continue
+                    if depth + self.bounds(neighbor_id, target)[0] > upper:
+                        continue
+                    parents[neighbor_id] = (movie_id, person_id)
+                    if neighbor_id == target:
+                        path = []
+                        while parents[neighbor_id] is not None:
+                            movie_id, parent_id = parents[neighbor_id]
+                            path.append((movie_id, neighbor_id))
+                            neighbor_id = parent_id
+                        path.reverse()
+                        return path
+                    next_layer.append(neighbor_id)
+            layer = next_layer
+
+        # Only the degree cap can hide a path the landmarks promised
+        if max_degrees is not None and upper == max_degrees:
+            stats["stopped_by"] = "max_degrees"
+        return None
@@ -0,0 +1,80 @@
+import bisect
+from array import array
+
+
+def trigrams(name):
+    """
+    Returns the set of 3-character substrings of a padded name.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Lookup structures over the lowercase names of degrees.names.
+
+    Names are kept in a sorted list for prefix search by bisection, and
+    every trigram maps to an array of positions in that list for fuzzy
+    matching. The trigram postings are built on the first fuzzy lookup
+    so that loads which never need them do not pay for them.
+    """
+
+    def __init__(self, names):
+        self.keys = sorted(names)
+        self.grams = None
+
+    def build_grams(self):
+        """
+        Builds the trigram postings used by fuzzy.
+        """
+        self.grams = {}
+        for position, name in enumerate(self.keys):
+            for gram in trigrams(name):
+                postings = self.grams.get(gram)
+                if postings is None:
+                    postings = self.grams[gram] = array("i")
+                postings.append(position)
+
+    def prefix(self, prefix, limit=None):
+        """
+        Returns names starting with prefix in alphabetical order.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        matches = []
+        for position in range(start, len(self.keys)):
+            name = self.keys[position]
+            if not name.startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(name)
+        return matches
+
+    def fuzzy(self, query, limit=10, threshold=0.3):
+        """
+        Returns up to `limit` (score, name) pairs most similar to query,
+        best first. The score is the Dice coefficient of the trigram
+        sets; names scoring below `threshold` are left out.
+        """
+        if self.grams is None:
+            self.build_grams()
+        query_grams = trigrams(query.lower())
+
+        # Count shared trigrams per candidate name
+        shared = {}
+        for gram in query_grams:
+            for position in self.grams.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        # At least this many trigrams must be shared to reach threshold
+        minimum = threshold * len(query_grams) / 2
+        scored = []
+        for position, count in shared.items():
+            if count < minimum:
+                continue
+            name = self.keys[position]
+            score = 2 * count / (len(query_grams) + len(trigrams(name)))
+            if score >= threshold:
+                scored.append((score, name))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
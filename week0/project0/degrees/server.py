@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import degrees
+
+
+def is_int(value):
+    """
+    Returns True if a JSON value is an integer, and not true or false.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class DegreesServer():
+    """
+    Answers JSON path queries against the dataset already loaded into
+    the degrees module.
+
+    A query is an object with "source" and "target" person ids (or
+    "source_name"/"target_name", resolved to the most prolific match),
+    and optionally "engine", "max_degrees" and "time_budget". An object
+    with "op": "metrics" returns the running totals instead.
+    """
+
+    def __init__(self, engine="bfs", cache_size=1024):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+        # Searches share module-level state in degrees, so run one at a
+        # time off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # Running totals
+        self.queries = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.total_explored = 0
+
+    def handle(self, message):
+        """
+        Returns the response object for one request object.
+        """
+        if message.get("op") == "metrics":
+            return self.metrics()
+
+        start = time.perf_counter()
+        try:
+            source = self.resolve(message, "source")
+            target = self.resolve(message, "target")
+            engine = message.get("engine", self.engine)
+            if not isinstance(engine, str) or engine not in degrees.ENGINES:
+                raise ValueError(f"unknown engine: {engine}")
+            max_degrees = message.get("max_degrees")
+            if max_degrees is not None and not is_int(max_degrees):
+                raise ValueError("max_degrees must be an integer")
+            time_budget = message.get("time_budget")
+            if time_budget is not None and not (
+                is_int(time_budget) or isinstance(time_budget, float)
+            ):
+                raise ValueError("time_budget must be a number")
+        except (KeyError, ValueError) as e:
+            self.errors += 1
+            return {"id": message.get("id"), "error": str(e)}
+
+        key = (source, target, engine, max_degrees)
+        response = self.cache.get(key)
+        if response is not None:
+            self.cache.move_to_end(key)
+            self.cache_hits += 1
+            response = dict(response, cached=True)
+        else:
+            stats = {}
+            path = degrees.shortest_path(source, target, engine=engine,
+                                         stats=stats, max_degrees=max_degrees,
+                                         time_budget=time_budget)
+            response = {
+                "source": source,
+                "target": target,
+                "degrees": None if path is None else len(path),
+                "path": path,
+                "stopped_by": stats["stopped_by"],
+                "explored": stats["explored"],
+                "cached": False
+            }
+            self.total_explored += stats["explored"]
+
+            # A search cut short by its time budget may succeed next time
+            if stats["stopped_by"] != "time_budget":
+                self.cache[key] = response
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        latency = time.perf_counter() - start
+        self.queries += 1
+        self.total_latency += latency
+        return dict(response, id=message.get("id"),
+                    latency_ms=1000 * latency)
+
+    def resolve(self, message, field):
+        """
+        Returns the person id named by a request's `field`.
+        """
+        if field in message:
+            person_id = str(message[field])
+            if person_id not in degrees.people:
+                raise ValueError(f"unknown person id: {person_id}")
+            return person_id
+        name = message[f"{field}_name"]
+        if not isinstance(name, str):
+            raise ValueError(f"{field}_name must be a string")
+        person_id = degrees.person_id_for_name(name, policy="prolific")
+        if person_id is None:
+            raise ValueError(f"person not found: {name}")
+        return person_id
+
+    def metrics(self):
+        """
+        Returns the running totals as a response object.
+        """
+        searched = self.queries - self.cache_hits
+        return {
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self.cache),
+            "errors": self.errors,
+            "mean_latency_ms": (
+                1000 * self.total_latency / self.queries
+                if self.queries else 0.0
+            ),
+            "mean_explored": (
+                self.total_explored / searched if searched else 0.0
+            )
+        }
+
+    async def respond(self, line):
+        """
+        Returns the JSON response line for one JSON request line.
+        """
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            self.errors += 1
+            return json.dumps({"error": f"bad request: {e}"}) + "\n"
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                self.executor, self.handle, message
+            )
+        except Exception as e:
+            # Keep serving this client and the others whatever the query
+            self.errors += 1
+            response = {"id": message.get("id"),
+                        "error": f"internal error: {e}"}
+        return json.dumps(response) + "\n"
+
+    async def serve_client(self, reader, writer):
+        """
+        Answers JSON lines from one socket client until it disconnects.
+        """
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    writer.write((await self.respond(line)).encode("utf-8"))
+                    await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_tcp(self, host, port):
+        """
+        Serves clients on a local TCP socket until cancelled.
+        """
+        server = await asyncio.start_server(self.serve_client, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Listening on {address[0]}:{address[1]}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self):
+        """
+        Answers JSON lines from stdin on stdout until end of input.
+        """
+        loop = asyncio.get_running_loop()
+        while line := await loop.run_in_executor(None, sys.stdin.readline):
+            if line.strip():
+                sys.stdout.write(await self.respond(line))
+                sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degrees query server")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stdio", action="store_true",
+                        help="answer JSON lines on stdin/stdout instead")
+    parser.add_argument("--engine", choices=sorted(degrees.ENGINES),
+                        default="bfs")
+    parser.add_argument("--backend", choices=degrees.BACKENDS, default="dict")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse a binary snapshot of the CSV files")
+    parser.add_argument("--costar-index", choices=degrees.COSTAR_MODES,
+                        default="off")
+    parser.add_argument("--results", type=int, default=1024,
+                        help="number of recent results to keep")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory, backend=args.backend, cache=args.cache)
+    degrees.set_costar_index(args.costar_index)
+    print("Data loaded.", file=sys.stderr)
+
+    server = DegreesServer(engine=args.engine, cache_size=args.results)
+    try:
+        if args.stdio:
+            asyncio.run(server.serve_stdio())
+        else:
+            asyncio.run(server.serve_tcp(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
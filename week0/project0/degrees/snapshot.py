@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+
+# Name of the snapshot file written next to the CSV files
+FILENAME = ".degrees.snapshot"
+
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Magic, format version and length of the JSON metadata block
+HEADER = struct.Struct("<8sII")
+
+
+def source_stamps(directory):
+    """
+    Returns the size and modification time of each CSV file, which a
+    snapshot must match to be reused.
+    """
+    stamps = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+def write_snapshot(path, stamps, graph, people, movies):
+    """
+    Writes the star graph and the people/movies metadata to `path`.
+
+    Layout: header, JSON metadata, the four CSR arrays (native int32),
+    then a NUL-separated UTF-8 string table.
+    """
+    person_ids = graph.person_ids
+    movie_ids = graph.movie_ids
+    strings = (
+        person_ids
+        + [people[pid]["name"] for pid in person_ids]
+        + [people[pid]["birth"] for pid in person_ids]
+        + movie_ids
+        + [movies[mid]["title"] for mid in movie_ids]
+        + [movies[mid]["year"] for mid in movie_ids]
+    )
+    table = "\0".join(strings).encode("utf-8")
+    arrays = [graph.person_offsets, graph.person_movies,
+              graph.movie_offsets, graph.movie_people]
+
+    meta = json.dumps({
+        "byteorder": sys.byteorder,
+        "sources": stamps,
+        "people": len(person_ids),
+        "movies": len(movie_ids),
+        "edges": len(graph.person_movies),
+        "strings": len(table),
+    }).encode("utf-8")
+
+    # Pad the metadata so the arrays start on a 4-byte boundary
+    meta += b" " * (-(HEADER.size + len(meta)) % 4)
+
+    # Write to a temporary file first so readers never see a partial file
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta)))
+        f.write(meta)
+        for a in arrays:
+            f.write(bytes(a))
+        f.write(table)
+    os.replace(temp, path)
+
+
+def read_snapshot(path, stamps):
+    """
+    Memory-maps the snapshot at `path`.
+
+    Returns (graph, people, movies) where people and movies are lists of
+    (name, birth) and (title, year) pairs aligned with the graph's ids,
+    or None if the snapshot is missing, truncated or corrupt, from
+    another format version or does not match `stamps`.
+
+    Only the graph arrays stay in the mapped file. The string table is
+    decoded in full, so reading is still linear in the size of the
+    dataset; what a snapshot saves is parsing and checking the CSV
+    files.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return None
+
+    try:
+        return parse_snapshot(buffer, stamps)
+    except (struct.error, ValueError, UnicodeDecodeError, KeyError,
+            TypeError):
+        # Truncated or corrupt: rebuild from the CSV files
+        return None
+
+
+def parse_snapshot(buffer, stamps):
+    """
+    Returns what read_snapshot does for a mapped snapshot, or None if it
+    is stale. Raises struct.error, ValueError or another parsing error
+    if the file is truncated or corrupt.
+    """
+    if len(buffer) < HEADER.size:
+        return None
+    magic, version, meta_size = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if len(buffer) < HEADER.size + meta_size:
+        return None
+    meta = json.loads(buffer[HEADER.size:HEADER.size + meta_size])
+    if meta["sources"] != stamps or meta["byteorder"] != sys.byteorder:
+        return None
+
+    n, m, edges = meta["people"], meta["movies"], meta["edges"]
+    offset = HEADER.size + meta_size
+    size = offset + 4 * (n + 1 + m + 1 + 2 * edges) + meta["strings"]
+    if len(buffer) != size:
+        return None
+
+    # The CSR arrays are views straight into the mapped file
+    view = memoryview(buffer)
+    arrays = []
+    for length in (n + 1, edges, m + 1, edges):
+        arrays.append(view[offset:offset + 4 * length].cast("i"))
+        offset += 4 * length
+
+    strings = bytes(view[offset:]).decode("utf-8").split("\0")
+    if len(strings) != 3 * n + 3 * m:
+        return None
+    person_ids = strings[:n]
+    person_rows = list(zip(strings[n:2 * n], strings[2 * n:3 * n]))
+    movie_ids = strings[3 * n:3 * n + m]
+    movie_rows = list(zip(strings[3 * n + m:3 * n + 2 * m],
+                          strings[3 * n + 2 * m:]))
+
+    graph = CompactGraph(person_ids, movie_ids, *arrays)
+    return graph, person_rows, movie_rows
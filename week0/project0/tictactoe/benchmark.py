@@ -0,0 +1,215 @@
+import argparse
+import copy
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import engine
+import tictactoe as ttt
+from verify import reachable_boards
+
+
+class DeepcopyCounter():
+    """
+    Counts calls to copy.deepcopy, including through a `deepcopy` name
+    imported into tictactoe, while installed.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.original = copy.deepcopy
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.original(*args, **kwargs)
+
+    def __enter__(self):
+        copy.deepcopy = self
+        if getattr(ttt, "deepcopy", None) is self.original:
+            ttt.deepcopy = self
+        return self
+
+    def __exit__(self, *exc):
+        copy.deepcopy = self.original
+        if getattr(ttt, "deepcopy", None) is self:
+            ttt.deepcopy = self.original
+
+
+def reset():
+    """
+    Forgets every position the engine has solved and the loaded opening
+    book, so each search starts cold.
+    """
+    engine.table.clear()
+    ttt.opening_book = None
+
+
+def engine_move(board, search, record):
+    """
+    Returns minimax's move on `board`, appending its latency in seconds
+    and the positions it visited or solved to `record`.
+    """
+    stats = {}
+    solved = len(engine.table)
+    start = time.perf_counter()
+    move = ttt.minimax(board, search=search, stats=stats)
+    record["latencies"].append(time.perf_counter() - start)
+    record["nodes"] += stats.get("nodes", 0) + len(engine.table) - solved
+    return move
+
+
+def play(board, search, record, random_player=None, rng=None):
+    """
+    Plays a game to the end from `board`, with minimax moving for both
+    players except `random_player`, who moves at random. Returns the
+    winner, or None for a tie.
+    """
+    while not ttt.terminal(board):
+        if ttt.player(board) == random_player:
+            move = rng.choice(sorted(ttt.actions(board)))
+        else:
+            move = engine_move(board, search, record)
+        board = ttt.result(board, move)
+    return ttt.winner(board)
+
+
+def percentile(values, q):
+    """Returns the nearest-rank q-th percentile of sorted values."""
+    if not values:
+        return None
+    rank = max(1, -(-q * len(values) // 100))
+    return values[rank - 1]
+
+
+def summarize(search, match, record, outcomes):
+    """
+    Returns the result dict for one search and kind of match.
+    """
+    latencies = sorted(1000 * s for s in record["latencies"])
+    moves = len(latencies)
+    return {
+        "search": search,
+        "match": match,
+        "games": outcomes["X"] + outcomes["O"] + outcomes["tie"],
+        "outcomes": outcomes,
+        "moves": moves,
+        "latency_ms": {
+            "mean": sum(latencies) / moves if moves else None,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if moves else None,
+        },
+        "nodes": record["nodes"],
+        "nodes_per_move": record["nodes"] / moves if moves else None,
+        "deepcopies": record["deepcopies"],
+    }
+
+
+def run(search, match, starts, games, seed):
+    """
+    Plays one kind of match with a cold search and returns its result
+    dict.
+
+    "self" plays minimax against itself from each of `starts`, a list
+    of (board, value with perfect play), and counts games that end
+    differently from perfect play as "suboptimal". "random" plays
+    `games` games from the initial state against a seeded random
+    player, alternating sides, and counts the games minimax loses.
+    """
+    reset()
+    record = {"latencies": [], "nodes": 0, "deepcopies": 0}
+    outcomes = {"X": 0, "O": 0, "tie": 0}
+    with DeepcopyCounter() as counter:
+        if match == "self":
+            outcomes["suboptimal"] = 0
+            for board, expected in starts:
+                winner = play(board, search, record)
+                outcomes[winner or "tie"] += 1
+                if {ttt.X: 1, ttt.O: -1, None: 0}[winner] != expected:
+                    outcomes["suboptimal"] += 1
+        else:
+            outcomes["lost"] = 0
+            rng = random.Random(seed)
+            for game in range(games):
+                random_player = ttt.O if game % 2 == 0 else ttt.X
+                winner = play(ttt.initial_state(), search, record,
+                              random_player, rng)
+                outcomes[winner or "tie"] += 1
+                if winner == random_player:
+                    outcomes["lost"] += 1
+        record["deepcopies"] = counter.calls
+    return summarize(search, match, record, outcomes)
+
+
+def peak_memory(search):
+    """
+    Returns the largest peak of bytes allocated by one minimax call in
+    a cold, traced self-play game from the initial state.
+    """
+    reset()
+    board = ttt.initial_state()
+    peak = 0
+    while not ttt.terminal(board):
+        tracemalloc.start()
+        move = ttt.minimax(board, search=search)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        board = ttt.result(board, move)
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark tictactoe minimax by self-play"
+    )
+    parser.add_argument("--searches", nargs="+", choices=ttt.SEARCHES,
+                        default=["book", "engine", "alphabeta"])
+    parser.add_argument("--starts", choices=["initial", "all"],
+                        default="all",
+                        help="play self-play games from the initial state "
+                        "only, or from every reachable unfinished position")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="number of games against the random player")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced game measuring peak memory")
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    if args.starts == "all":
+        boards = [board for board in reachable_boards().values()
+                  if not ttt.terminal(board)]
+    else:
+        boards = [ttt.initial_state()]
+    starts = [(board, engine.value(*engine.encode(board, ttt.X, ttt.O)))
+              for board in boards]
+
+    results = []
+    for search in args.searches:
+        for match in ["self", "random"]:
+            print(f"{search}: {match}", file=sys.stderr)
+            result = run(search, match, starts, args.games, args.seed)
+            if not args.no_memory and match == "self":
+                result["peak_bytes"] = peak_memory(search)
+            results.append(result)
+
+    report = {
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "starts": len(starts),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Perfect-play opening book for Tic Tac Toe.
+
+The book holds the engine's value and best move for every legal
+position, reduced to one entry per class of positions equal under the
+8 symmetries of the board. Run this module to regenerate it.
+"""
+
+import argparse
+import os
+import struct
+import sys
+from array import array
+
+import engine
+
+MAGIC = b"TTTBOOK\0"
+VERSION = 1
+
+# Book shipped next to this module
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening.book")
+
+# Magic, format version and number of entries
+HEADER = struct.Struct("<8sII")
+
+# Move stored for positions that are already over
+NO_MOVE = 15
+
+
+def symmetries():
+    """
+    Returns the 8 symmetries of the board as lists mapping each cell to
+    its image: four rotations, each with and without a mirror.
+    """
+    result = []
+    for mirror in [False, True]:
+        for turns in range(4):
+            image = []
+            for cell in range(9):
+                i, j = divmod(cell, 3)
+                if mirror:
+                    j = 2 - j
+                for _ in range(turns):
+                    i, j = j, 2 - i
+                image.append(3 * i + j)
+            result.append(image)
+    return result
+
+
+SYMMETRIES = symmetries()
+
+# Inverse of each symmetry, to map a move in a canonical position back
+INVERSES = [
+    [image.index(cell) for cell in range(9)] for image in SYMMETRIES
+]
+
+# Image of every 9-bit mask under each symmetry
+MASKS = [
+    [sum(1 << image[cell] for cell in range(9) if mask >> cell & 1)
+     for mask in range(1 << 9)]
+    for image in SYMMETRIES
+]
+
+
+def canonical(x_mask, o_mask):
+    """
+    Returns (key, symmetry) for a position, where key packs the smallest
+    image of the position over all symmetries as x | o << 9 and
+    symmetry is the index of the one that produced it.
+    """
+    return min(
+        (masks[x_mask] | masks[o_mask] << 9, s)
+        for s, masks in enumerate(MASKS)
+    )
+
+
+def build():
+    """
+    Returns the book as a dict from canonical key to (move, value),
+    solving every legal position with the engine.
+    """
+    entries = {}
+    stack = [(0, 0)]
+    while stack:
+        x_mask, o_mask = stack.pop()
+        key = canonical(x_mask, o_mask)[0]
+        if key in entries:
+            continue
+        x_mask, o_mask = key & engine.FULL, key >> 9
+        move = engine.best_move(x_mask, o_mask)
+        entries[key] = (NO_MOVE if move is None else move,
+                        engine.value(x_mask, o_mask))
+        if move is not None:
+            for cell in engine.moves(x_mask, o_mask):
+                stack.append(engine.play(x_mask, o_mask, cell))
+    return entries
+
+
+def write_book(path, entries):
+    """
+    Writes a book to `path`.
+
+    Layout: header, then one unsigned 32-bit little-endian record per
+    entry in key order, holding the key in bits 0-17, the move in bits
+    18-21 and the value plus one in bits 22-23.
+    """
+    records = array("I", [
+        key | move << 18 | (value + 1) << 22
+        for key, (move, value) in sorted(entries.items())
+    ])
+    if sys.byteorder != "little":
+        records.byteswap()
+
+    # Write to a temporary file first so readers never see a partial file
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        f.write(bytes(records))
+    os.replace(temp, path)
+
+
+def read_book(path=PATH):
+    """
+    Returns the book at `path` as written by write_book, or None if it
+    is missing or was written by another version.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    records = array("I")
+    records.frombytes(data[HEADER.size:HEADER.size + 4 * count])
+    if sys.byteorder != "little":
+        records.byteswap()
+    return {
+        record & 0x3FFFF: (record >> 18 & 0xF, (record >> 22) - 1)
+        for record in records
+    }
+
+
+def lookup(book, x_mask, o_mask):
+    """
+    Returns (move, value) for a position: the cell to play, or None if
+    the game is over, and its value from X's point of view.
+    """
+    key, s = canonical(x_mask, o_mask)
+    move, value = book[key]
+    if move == NO_MOVE:
+        return None, value
+    return INVERSES[s][move], value
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Regenerate the Tic Tac Toe opening book"
+    )
+    parser.add_argument("-o", "--output", default=PATH)
+    args = parser.parse_args()
+
+    entries = build()
+    write_book(args.output, entries)
+    print(f"Wrote {len(entries)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Bitboard Tic Tac Toe engine.
+
+A position is a pair of 9-bit masks (x, o), one per player, where bit
+3 * i + j is set if that player holds cell (i, j).
+"""
+
+# Every cell taken
+FULL = 0b111111111
+
+# Masks of the three rows, three columns and two diagonals
+WIN_MASKS = (
+    [0b111 << (3 * i) for i in range(3)]
+    + [0b1001001 << j for j in range(3)]
+    + [0b100010001, 0b001010100]
+)
+
+# Solved values of positions, from X's point of view, keyed by (x, o)
+table = {}
+
+
+def encode(board, x="X", o="O"):
+    """
+    Returns the (x, o) masks of a 3x3 list-of-lists board.
+    """
+    x_mask = o_mask = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == x:
+                x_mask |= 1 << (3 * i + j)
+            elif cell == o:
+                o_mask |= 1 << (3 * i + j)
+    return x_mask, o_mask
+
+
+def decode(x_mask, o_mask, x="X", o="O", empty=None):
+    """
+    Returns the 3x3 list-of-lists board of an (x, o) position.
+    """
+    board = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(x if x_mask & bit else o if o_mask & bit else empty)
+        board.append(row)
+    return board
+
+
+def x_to_move(x_mask, o_mask):
+    """
+    Returns True if X has the next turn. X always moves first.
+    """
+    return bin(x_mask).count("1") == bin(o_mask).count("1")
+
+
+def is_win(mask):
+    """
+    Returns True if a player's mask holds a full row, column or diagonal.
+    """
+    for win in WIN_MASKS:
+        if mask & win == win:
+            return True
+    return False
+
+
+def moves(x_mask, o_mask):
+    """
+    Returns the free cells of a position, in index order.
+    """
+    free = FULL & ~(x_mask | o_mask)
+    return [cell for cell in range(9) if free >> cell & 1]
+
+
+def play(x_mask, o_mask, cell):
+    """
+    Returns the position after the player to move takes `cell`.
+    """
+    bit = 1 << cell
+    if (x_mask | o_mask) & bit:
+        raise ValueError(f"cell {cell} is already taken")
+    if x_to_move(x_mask, o_mask):
+        return x_mask | bit, o_mask
+    return x_mask, o_mask | bit
+
+
+def value(x_mask, o_mask):
+    """
+    Returns 1 if X wins the position with best play, -1 if O does and
+    0 for a draw. Solved positions are kept in `table`, so each of the
+    5,478 legal positions is searched at most once.
+    """
+    key = (x_mask, o_mask)
+    if key in table:
+        return table[key]
+
+    if is_win(x_mask):
+        v = 1
+    elif is_win(o_mask):
+        v = -1
+    elif x_mask | o_mask == FULL:
+        v = 0
+    else:
+        values = [value(*play(x_mask, o_mask, cell))
+                  for cell in moves(x_mask, o_mask)]
+        v = max(values) if x_to_move(x_mask, o_mask) else min(values)
+
+    table[key] = v
+    return v
+
+
+def best_move(x_mask, o_mask):
+    """
+    Returns the first cell, in index order, that keeps the best value
+    for the player to move, or None if the game is over.
+    """
+    if (is_win(x_mask) or is_win(o_mask)
+            or x_mask | o_mask == FULL):
+        return None
+    sign = 1 if x_to_move(x_mask, o_mask) else -1
+    return max(moves(x_mask, o_mask),
+               key=lambda cell: sign * value(*play(x_mask, o_mask, cell)))
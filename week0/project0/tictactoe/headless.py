@@ -0,0 +1,106 @@
+"""
+Drives runner.py without a screen: SDL's dummy video driver stands in
+for the display and a scripted mouse clicks "Play as O", so the
+computer moves first. Reports frame timings while the computer thinks.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import runner
+import tictactoe as ttt
+
+
+class FakeMouse():
+    """
+    Stands in for pygame.mouse, pressing the left button at `position`
+    on frame number `frame` only.
+    """
+
+    def __init__(self, frame, position):
+        self.frame = frame
+        self.position = position
+        self.frames = 0
+
+    def get_pressed(self):
+        return (1 if self.frames == self.frame else 0), 0, 0
+
+    def get_pos(self):
+        return self.position
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the game headless and time its frames"
+    )
+    parser.add_argument("--search", choices=ttt.SEARCHES, default="plain")
+    parser.add_argument("--fps", type=int, default=runner.FPS)
+    parser.add_argument("--seconds", type=float, default=15.0,
+                        help="how long to run the game for")
+    args = parser.parse_args()
+
+    # Click "Play as O" on the fifth frame
+    mouse = FakeMouse(5, (5 * runner.width // 8 + runner.width // 8,
+                          runner.height // 2 + 25))
+    pygame.mouse.get_pressed = mouse.get_pressed
+    pygame.mouse.get_pos = mouse.get_pos
+
+    # Time each frame as it is shown
+    flips = []
+    flip = pygame.display.flip
+
+    def timed_flip():
+        flip()
+        mouse.frames += 1
+        flips.append(time.perf_counter())
+    pygame.display.flip = timed_flip
+
+    # Time each search
+    searches = []
+    minimax = ttt.minimax
+
+    def timed_minimax(*args, **kwargs):
+        start = time.perf_counter()
+        move = minimax(*args, **kwargs)
+        searches.append((start, time.perf_counter()))
+        return move
+    ttt.minimax = timed_minimax
+
+    runner.run(args.search, args.fps, int(args.seconds * args.fps))
+
+    intervals = [b - a for a, b in zip(flips, flips[1:])]
+    thinking = [
+        b - a for a, b in zip(flips, flips[1:])
+        if any(start <= b and a <= end for start, end in searches)
+    ]
+    report = {
+        "search": args.search,
+        "fps": args.fps,
+        "frames": len(flips),
+        "searches": len(searches),
+        "search_seconds": [end - start for start, end in searches],
+        "frame_ms": {
+            "mean": 1000 * sum(intervals) / len(intervals),
+            "max": 1000 * max(intervals),
+        },
+        "thinking_frame_ms": {
+            "frames": len(thinking),
+            "mean": 1000 * sum(thinking) / len(thinking) if thinking else None,
+            "max": 1000 * max(thinking) if thinking else None,
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if not searches:
+        sys.exit("The computer never moved.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Engine for m,n,k-games: two players take turns on an m x n board and
+the first to get k in a row, column or diagonal wins. Tic Tac Toe is
+the 3,3,3-game and gomoku the 15,15,5-game.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 10 ** 9
+
+# Scores above this are forced wins
+WON = WIN - 10 ** 6
+
+# Kinds of transposition table entry
+EXACT, LOWER, UPPER = range(3)
+
+# Nodes searched between checks of the time budget
+CHECK_EVERY = 1024
+
+
+class Timeout(Exception):
+    pass
+
+
+class MNKGame():
+    """
+    Board geometry and search state shared by every position of one
+    m,n,k-game.
+
+    A board is split into its windows: every run of k cells in a line.
+    Boards keep per-window stone counts, which give both the win test
+    after a move and the evaluation incrementally. Searched positions
+    are kept in a transposition table keyed by Zobrist hash.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3, radius=None, seed=0):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError(f"cannot get {k} in a row on {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+
+        # Moves are only tried within `radius` cells of a stone; small
+        # boards try every empty cell
+        if radius is None:
+            radius = 0 if self.size <= 25 else 1
+        self.radius = radius
+
+        # Every window, as a tuple of cells, and the windows through
+        # each cell
+        self.windows = []
+        for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for r in range(rows):
+                for c in range(cols):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        self.windows.append(tuple(
+                            (r + dr * i) * cols + c + dc * i for i in range(k)
+                        ))
+        self.cell_windows = [[] for _ in range(self.size)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+
+        # Score of a window holding x X stones and o O stones, from X's
+        # point of view: only windows one player can still fill count
+        weights = [0] + [4 ** n for n in range(1, k + 1)]
+        self.scores = [
+            [0 if x and o else weights[x] - weights[o] for o in range(k + 1)]
+            for x in range(k + 1)
+        ]
+
+        # Every cell, nearest the center first, and the cells within
+        # radius of each cell
+        center = ((rows - 1) / 2, (cols - 1) / 2)
+        self.order = sorted(
+            range(self.size),
+            key=lambda cell: (abs(cell // cols - center[0])
+                              + abs(cell % cols - center[1]))
+        )
+        self.nearby = [
+            [n for n in range(self.size)
+             if n != cell
+             and abs(n // cols - cell // cols) <= radius
+             and abs(n % cols - cell % cols) <= radius]
+            for cell in range(self.size)
+        ]
+
+        rng = random.Random(seed)
+        self.zobrist = [
+            None,
+            [rng.getrandbits(64) for _ in range(self.size)],
+            [rng.getrandbits(64) for _ in range(self.size)],
+        ]
+        self.table = {}
+        self.nodes = 0
+
+    def board(self, rows=None):
+        """
+        Returns a Board for a list of rows of X, O and EMPTY, or an
+        empty board.
+        """
+        board = Board(self)
+        if rows is not None:
+            x_cells = [i * self.cols + j for i, row in enumerate(rows)
+                       for j, cell in enumerate(row) if cell == X]
+            o_cells = [i * self.cols + j for i, row in enumerate(rows)
+                       for j, cell in enumerate(row) if cell == O]
+            if not 0 <= len(x_cells) - len(o_cells) <= 1:
+                raise ValueError("X moves first and players alternate")
+            for cell in x_cells:
+                board.place(cell, 1)
+            for cell in o_cells:
+                board.place(cell, 2)
+            board.to_move = 1 if len(x_cells) == len(o_cells) else 2
+        return board
+
+    def search(self, board, time_budget=None, max_depth=None, stats=None):
+        """
+        Returns the best move (i, j) for the player to move on `board`
+        by iterative-deepening alpha-beta search, or None if the game is
+        over.
+
+        Deeper searches run until one proves the result, reaches
+        max_depth or runs out of time_budget seconds, and the move from
+        the deepest finished search is returned. If given, `stats`
+        receives the depth reached, its value for the player to move,
+        the nodes searched and why the search stopped.
+        """
+        if stats is None:
+            stats = {}
+        if board.winner is not None or board.filled == self.size:
+            stats.update(depth=0, value=None, nodes=0, stopped_by="game_over")
+            return None
+
+        board = board.copy()
+        deadline = None
+        if time_budget is not None:
+            deadline = time.perf_counter() + time_budget
+        remaining = self.size - board.filled
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+
+        self.nodes = 0
+        move = board.candidates(None)[0]
+        value = None
+        depth = 0
+        stopped_by = "max_depth"
+        for d in range(1, max_depth + 1):
+            try:
+                value = self.negamax(board, d, -WIN - 1, WIN + 1, deadline)
+            except Timeout:
+                stopped_by = "time_budget"
+                break
+            depth = d
+            move = self.table[board.hash][3]
+            if abs(value) > WON:
+                stopped_by = "solved"
+                break
+        else:
+            if depth == remaining:
+                stopped_by = "solved"
+
+        stats.update(depth=depth, value=value, nodes=self.nodes,
+                     stopped_by=stopped_by)
+        return divmod(move, self.cols)
+
+    def negamax(self, board, depth, alpha, beta, deadline):
+        """
+        Returns the value of `board` for the player to move, searched
+        `depth` moves deep, or a bound on it outside (alpha, beta).
+        """
+        self.nodes += 1
+        if (deadline is not None and self.nodes % CHECK_EVERY == 0
+                and time.perf_counter() > deadline):
+            raise Timeout
+
+        original_alpha = alpha
+        key = board.hash
+        entry = self.table.get(key)
+        best_move = None
+        if entry is not None:
+            entry_depth, kind, value, best_move = entry
+            if entry_depth >= depth:
+                if kind == EXACT:
+                    return value
+                if kind == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        if board.filled == self.size:
+            return 0
+        if depth == 0:
+            return board.score if board.to_move == 1 else -board.score
+
+        best = -WIN - 1
+        for cell in board.candidates(best_move):
+            if board.play(cell):
+                value = WIN
+            else:
+                value = -self.negamax(board, depth - 1, -beta, -alpha,
+                                      deadline)
+
+                # Prefer quicker wins and slower losses
+                if value > WON:
+                    value -= 1
+                elif value < -WON:
+                    value += 1
+            board.undo(cell)
+            if value > best:
+                best = value
+                best_move = cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table[key] = (depth, kind, best, best_move)
+        return best
+
+
+class Board():
+    """
+    Position of an m,n,k-game, changed in place by play and undo.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.cells = bytearray(game.size)
+        self.counts = [None, [0] * len(game.windows), [0] * len(game.windows)]
+        self.score = 0
+        self.hash = 0
+        self.filled = 0
+        self.to_move = 1
+        self.winner = None
+
+    def copy(self):
+        board = Board(self.game)
+        board.cells = self.cells[:]
+        board.counts = [None, self.counts[1][:], self.counts[2][:]]
+        board.score = self.score
+        board.hash = self.hash
+        board.filled = self.filled
+        board.to_move = self.to_move
+        board.winner = self.winner
+        return board
+
+    def rows(self):
+        """
+        Returns the board as a list of rows of X, O and EMPTY.
+        """
+        symbols = [EMPTY, X, O]
+        cols = self.game.cols
+        return [
+            [symbols[cell] for cell in self.cells[r * cols:(r + 1) * cols]]
+            for r in range(self.game.rows)
+        ]
+
+    def place(self, cell, player):
+        """
+        Puts a stone of `player` (1 for X, 2 for O) on an empty cell and
+        returns True if it completes a window.
+        """
+        if self.cells[cell]:
+            raise ValueError(f"cell {divmod(cell, self.game.cols)} is taken")
+        game = self.game
+        mine = self.counts[player]
+        theirs = self.counts[3 - player]
+        scores = game.scores
+        won = False
+        sign = 1 if player == 1 else -1
+        for w in game.cell_windows[cell]:
+            self.score += sign * (scores[mine[w] + 1][theirs[w]]
+                                  - scores[mine[w]][theirs[w]])
+            mine[w] += 1
+            if mine[w] == game.k:
+                won = True
+        self.cells[cell] = player
+        self.hash ^= game.zobrist[player][cell]
+        self.filled += 1
+        if won and self.winner is None:
+            self.winner = player
+        return won
+
+    def play(self, cell):
+        """
+        Plays the player to move on `cell`. Returns True if that wins.
+        """
+        if self.winner is not None:
+            raise ValueError("game is over")
+        won = self.place(cell, self.to_move)
+        self.to_move = 3 - self.to_move
+        return won
+
+    def undo(self, cell):
+        """
+        Takes back the move on `cell`, which must be the last one played.
+        """
+        game = self.game
+        player = self.cells[cell]
+        mine = self.counts[player]
+        theirs = self.counts[3 - player]
+        scores = game.scores
+        sign = 1 if player == 1 else -1
+        for w in game.cell_windows[cell]:
+            mine[w] -= 1
+            self.score -= sign * (scores[mine[w] + 1][theirs[w]]
+                                  - scores[mine[w]][theirs[w]])
+        self.cells[cell] = 0
+        self.hash ^= game.zobrist[player][cell]
+        self.filled -= 1
+        self.to_move = player
+        self.winner = None
+
+    def candidates(self, first):
+        """
+        Returns the empty cells worth trying, `first` (if given) and then
+        the rest nearest the center first. With a radius, only cells
+        near a stone are tried, or the center on an empty board.
+        """
+        game = self.game
+        cells = self.cells
+        if game.radius and not self.filled:
+            result = game.order[:1]
+        elif game.radius:
+            near = set()
+            for cell in range(game.size):
+                if cells[cell]:
+                    near.update(n for n in game.nearby[cell] if not cells[n])
+            result = [cell for cell in game.order if cell in near]
+        else:
+            result = [cell for cell in game.order if not cells[cell]]
+        if first is not None and first in result:
+            result.remove(first)
+            result.insert(0, first)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch the m,n,k-game engine play itself"
+    )
+    parser.add_argument("rows", type=int, nargs="?", default=3)
+    parser.add_argument("cols", type=int, nargs="?", default=3)
+    parser.add_argument("k", type=int, nargs="?", default=3)
+    parser.add_argument("--time-budget", type=float, default=1.0,
+                        help="seconds to search each move")
+    parser.add_argument("--max-depth", type=int)
+    parser.add_argument("--radius", type=int)
+    args = parser.parse_args()
+
+    game = MNKGame(args.rows, args.cols, args.k, radius=args.radius)
+    board = game.board()
+    while True:
+        stats = {}
+        move = game.search(board, args.time_budget, args.max_depth, stats)
+        if move is None:
+            break
+        board.play(move[0] * game.cols + move[1])
+        print(f"{X if board.to_move == 2 else O} plays {move}: depth "
+              f"{stats['depth']}, {stats['nodes']} nodes, stopped by "
+              f"{stats['stopped_by']}", file=sys.stderr)
+        for row in board.rows():
+            print("".join(cell or "." for cell in row))
+        print()
+
+    if board.winner is None:
+        print("Game Over: Tie.")
+    else:
+        print(f"Game Over: {[EMPTY, X, O][board.winner]} wins.")
+
+
+if __name__ == "__main__":
+    main()
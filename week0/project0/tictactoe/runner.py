@@ -1,146 +1,253 @@
-import pygame
+import argparse
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
 
 import tictactoe as ttt
 
-pygame.init()
 size = width, height = 600, 400
 
 # Colors
 black = (0, 0, 0)
 white = (255, 255, 255)
 
-screen = pygame.display.set_mode(size)
-
-mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
-largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
-
-user = None
-board = ttt.initial_state()
-ai_turn = False
-
-while True:
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    screen.fill(black)
-
-    # Let user choose a player.
-    if user is None:
-
-        # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Draw buttons
-        playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
-        playX = mediumFont.render("Play as X", True, black)
-        playXRect = playX.get_rect()
-        playXRect.center = playXButton.center
-        pygame.draw.rect(screen, white, playXButton)
-        screen.blit(playX, playXRect)
-
-        playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
-        playO = mediumFont.render("Play as O", True, black)
-        playORect = playO.get_rect()
-        playORect.center = playOButton.center
-        pygame.draw.rect(screen, white, playOButton)
-        screen.blit(playO, playORect)
-
-        # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.O
-
-    else:
-
-        # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
-        tiles = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                rect = pygame.Rect(
-                    tile_origin[0] + j * tile_size,
-                    tile_origin[1] + i * tile_size,
-                    tile_size, tile_size
-                )
-                pygame.draw.rect(screen, white, rect, 3)
-
-                if board[i][j] != ttt.EMPTY:
-                    move = moveFont.render(board[i][j], True, white)
-                    moveRect = move.get_rect()
-                    moveRect.center = rect.center
-                    screen.blit(move, moveRect)
-                row.append(rect)
-            tiles.append(row)
-
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
-
-        # Show title
-        if game_over:
-            winner = ttt.winner(board)
-            if winner is None:
-                title = f"Game Over: Tie."
-            else:
-                title = f"Game Over: {winner} wins."
-        elif user == player:
-            title = f"Play as {user}"
-        else:
-            title = f"Computer thinking..."
-        title = largeFont.render(title, True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 30)
-        screen.blit(title, titleRect)
-
-        # Check for AI move
-        if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+# Frames drawn per second
+FPS = 30
+
+# Shortest time the computer appears to think, so its move can be seen
+THINK_TIME = 0.5
+
+
+class AIPlayer():
+    """
+    Computes minimax moves in a background thread, so the window keeps
+    drawing while the computer thinks.
+    """
+
+    def __init__(self, search="book"):
+        self.search = search
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.stats = None
+        self.started = None
+
+    def start(self, board):
+        """
+        Starts searching for a move on `board`, cancelling any search
+        already running.
+        """
+        self.cancel()
+        self.stats = {"cancel": threading.Event()}
+        self.started = time.perf_counter()
+        self.future = self.executor.submit(
+            ttt.minimax, board, self.search, self.stats
+        )
+
+    def thinking(self):
+        return self.future is not None
+
+    def poll(self):
+        """
+        Returns the move found, once the search is done and THINK_TIME
+        has passed, or None.
+        """
+        if self.future is None or not self.future.done():
+            return None
+        if time.perf_counter() - self.started < THINK_TIME:
+            return None
+        future = self.future
+        self.future = None
+        return future.result()
+
+    def cancel(self):
+        """
+        Abandons the current search. A running search stops at its next
+        position, and its result is never used.
+        """
+        if self.future is not None:
+            self.stats["cancel"].set()
+            self.future.cancel()
+            self.future = None
+
+    def progress(self):
+        """
+        Returns a line describing the current search.
+        """
+        text = f"{time.perf_counter() - self.started:.1f}s"
+        nodes = self.stats.get("nodes")
+        if nodes:
+            text += f", {nodes:,} positions"
+        return text
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown()
+
+
+def run(search="book", fps=FPS, max_frames=None):
+    """
+    Runs the game window until it is closed, or for max_frames frames.
+    """
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+
+    mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
+    largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
+    moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+    clock = pygame.time.Clock()
+    ai = AIPlayer(search)
+    user = None
+    board = ttt.initial_state()
+    frames = 0
+
+    try:
+        while max_frames is None or frames < max_frames:
+            frames += 1
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+
+            screen.fill(black)
+
+            # Let user choose a player.
+            if user is None:
+
+                # Draw title
+                title = largeFont.render("Play Tic-Tac-Toe", True, white)
+                titleRect = title.get_rect()
+                titleRect.center = ((width / 2), 50)
+                screen.blit(title, titleRect)
+
+                # Draw buttons
+                playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
+                playX = mediumFont.render("Play as X", True, black)
+                playXRect = playX.get_rect()
+                playXRect.center = playXButton.center
+                pygame.draw.rect(screen, white, playXButton)
+                screen.blit(playX, playXRect)
+
+                playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
+                playO = mediumFont.render("Play as O", True, black)
+                playORect = playO.get_rect()
+                playORect.center = playOButton.center
+                pygame.draw.rect(screen, white, playOButton)
+                screen.blit(playO, playORect)
+
+                # Check if button is clicked
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1:
+                    mouse = pygame.mouse.get_pos()
+                    if playXButton.collidepoint(mouse):
+                        time.sleep(0.2)
+                        user = ttt.X
+                    elif playOButton.collidepoint(mouse):
+                        time.sleep(0.2)
+                        user = ttt.O
+
             else:
-                ai_turn = True
-
-        # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
-
-    pygame.display.flip()
+
+                # Draw game board
+                tile_size = 80
+                tile_origin = (width / 2 - (1.5 * tile_size),
+                               height / 2 - (1.5 * tile_size))
+                tiles = []
+                for i in range(3):
+                    row = []
+                    for j in range(3):
+                        rect = pygame.Rect(
+                            tile_origin[0] + j * tile_size,
+                            tile_origin[1] + i * tile_size,
+                            tile_size, tile_size
+                        )
+                        pygame.draw.rect(screen, white, rect, 3)
+
+                        if board[i][j] != ttt.EMPTY:
+                            move = moveFont.render(board[i][j], True, white)
+                            moveRect = move.get_rect()
+                            moveRect.center = rect.center
+                            screen.blit(move, moveRect)
+                        row.append(rect)
+                    tiles.append(row)
+
+                game_over = ttt.terminal(board)
+                player = ttt.player(board)
+
+                # Show title
+                if game_over:
+                    winner = ttt.winner(board)
+                    if winner is None:
+                        title = f"Game Over: Tie."
+                    else:
+                        title = f"Game Over: {winner} wins."
+                elif user == player:
+                    title = f"Play as {user}"
+                else:
+                    title = f"Computer thinking..."
+                title = largeFont.render(title, True, white)
+                titleRect = title.get_rect()
+                titleRect.center = ((width / 2), 30)
+                screen.blit(title, titleRect)
+
+                # Start the AI move in the background, and play it once
+                # it is ready
+                if user != player and not game_over:
+                    if not ai.thinking():
+                        ai.start(board)
+                    move = ai.poll()
+                    if move is not None:
+                        board = ttt.result(board, move)
+                    else:
+                        progress = mediumFont.render(ai.progress(), True, white)
+                        progressRect = progress.get_rect()
+                        progressRect.center = ((width / 2), height - 40)
+                        screen.blit(progress, progressRect)
+
+                # Check for a user move
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1 and user == player and not game_over:
+                    mouse = pygame.mouse.get_pos()
+                    for i in range(3):
+                        for j in range(3):
+                            if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+                                board = ttt.result(board, (i, j))
+
+                if game_over:
+                    againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+                    again = mediumFont.render("Play Again", True, black)
+                    againRect = again.get_rect()
+                    againRect.center = againButton.center
+                    pygame.draw.rect(screen, white, againButton)
+                    screen.blit(again, againRect)
+                    click, _, _ = pygame.mouse.get_pressed()
+                    if click == 1:
+                        mouse = pygame.mouse.get_pos()
+                        if againButton.collidepoint(mouse):
+                            time.sleep(0.2)
+                            ai.cancel()
+                            user = None
+                            board = ttt.initial_state()
+
+            pygame.display.flip()
+            clock.tick(fps)
+    finally:
+        ai.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe")
+    parser.add_argument("--search", choices=ttt.SEARCHES, default="book",
+                        help="how the computer finds its moves")
+    parser.add_argument("--fps", type=int, default=FPS)
+    args = parser.parse_args()
+
+    run(args.search, args.fps)
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,30 @@
-from copy import deepcopy
 """
 Tic Tac Toe Player
 """
 
 import math
 
+import book
+import engine
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Searches accepted by minimax
+SEARCHES = ["book", "engine", "alphabeta", "plain"]
+
+# Opening book used by minimax, read on first use
+opening_book = None
+
+# Order alpha-beta tries moves in: center, corners, then edges
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+
+class SearchCancelled(Exception):
+    pass
+
 
 def initial_state():
     """
@@ -23,50 +39,37 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    num_empty = 0
-    for row in board:
-        for cell in row:
-            if cell == EMPTY:
-                num_empty += 1
-    if (num_empty % 2) == 0:
-        return O
-    else:
-        return X
+    return X if engine.x_to_move(*engine.encode(board, X, O)) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    possible_set = set()
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == EMPTY:
-                possible_set.add((i, j))
-    return possible_set
+    x_mask, o_mask = engine.encode(board, X, O)
+    return {divmod(cell, 3) for cell in engine.moves(x_mask, o_mask)}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    copy_board = deepcopy(board)
-    copy_board[action[0]][action[1]] = player(board)
-    return copy_board
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3):
+        raise ValueError(f"invalid action: {action}")
+    position = engine.play(*engine.encode(board, X, O), 3 * i + j)
+    return engine.decode(*position, X, O, EMPTY)
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for row in range(3):
-        if (board[row][0] != None) and (board[row][0] == board[row][1] == board[row][2]):
-            return board[row][0]
-    for column in range(3):
-        if (board[0][column] != None) and (board[0][column] == board[1][column] == board[2][column]):
-            return board[0][column]
-    if (board[1][1] != None) and ((board[0][0] == board[1][1] == board[2][2]) or (board[0][2] == board[1][1] == board[2][0])):
-        return board[1][1]
+    x_mask, o_mask = engine.encode(board, X, O)
+    if engine.is_win(x_mask):
+        return X
+    elif engine.is_win(o_mask):
+        return O
     else:
         return None
 
@@ -75,13 +78,9 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board):
-        return True
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == None:
-                return False
-    return True
+    x_mask, o_mask = engine.encode(board, X, O)
+    return (engine.is_win(x_mask) or engine.is_win(o_mask)
+            or x_mask | o_mask == engine.FULL)
 
 
 def utility(board):
@@ -96,43 +95,140 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def minimax(board, search="book", stats=None):
     """
     Returns the optimal action for the current player on the board.
-    """
+
+    `search` is one of SEARCHES. "book" looks the move up in the
+    precomputed opening book, falling back to the engine if the book
+    file is missing. "engine" solves positions with the bitboard
+    engine, which remembers every position it has seen, so the search
+    runs once per process. "alphabeta" and "plain" search the board
+    with max_value/min_value, with and without pruning, counting the
+    positions they visit in stats["nodes"] if given, and stop with
+    SearchCancelled once stats["cancel"] is set.
+    """
+    global opening_book
+
+    if search not in SEARCHES:
+        raise ValueError(f"unknown search: {search}")
+    if search == "book":
+        if opening_book is None:
+            opening_book = book.read_book() or {}
+        if opening_book:
+            cell = book.lookup(opening_book, *engine.encode(board, X, O))[0]
+            return None if cell is None else divmod(cell, 3)
+        search = "engine"
+    if search == "engine":
+        cell = engine.best_move(*engine.encode(board, X, O))
+        if cell is None:
+            return None
+        return divmod(cell, 3)
+
     if terminal(board):
         return None
+    prune = search == "alphabeta"
+    moves = ordered_actions(board) if prune else actions(board)
     if player(board) == X:
         highest_value = -math.inf
         optimal_move = (1, 1)
-        for action in actions(board):
-            value = min_value(result(board, action))
+        for action in moves:
+            if prune:
+                value = alpha_beta_min(result(board, action),
+                                       highest_value, math.inf, stats)
+            else:
+                value = min_value(result(board, action), stats)
             if value > highest_value:
                 highest_value = value
                 optimal_move = action
+                if prune and value == 1:
+                    break
         return optimal_move
     else:
         smallest_value = math.inf
         optimal_move = (1, 1)
-        for action in actions(board):
-            value = max_value(result(board, action))
+        for action in moves:
+            if prune:
+                value = alpha_beta_max(result(board, action),
+                                       -math.inf, smallest_value, stats)
+            else:
+                value = max_value(result(board, action), stats)
             if value < smallest_value:
                 smallest_value = value
                 optimal_move = action
+                if prune and value == -1:
+                    break
         return optimal_move
-        
-def max_value(board):
+
+
+def count_node(stats):
+    """
+    Counts a visited position in stats["nodes"]. Raises SearchCancelled
+    if stats["cancel"], an Event another thread may set, is set.
+    """
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + 1
+        cancel = stats.get("cancel")
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+
+
+def max_value(board, stats=None):
+    count_node(stats)
     if terminal(board):
         return utility(board)
     v = -math.inf
     for action in actions(board):
-        v = max(v, min_value(result(board, action)))
+        v = max(v, min_value(result(board, action), stats))
     return v
 
-def min_value(board):
+def min_value(board, stats=None):
+    count_node(stats)
     if terminal(board):
         return utility(board)
     v = math.inf
     for action in actions(board):
-        v = min(v, max_value(result(board, action)))
+        v = min(v, max_value(result(board, action), stats))
+    return v
+
+
+def ordered_actions(board):
+    """
+    Returns the possible actions on the board in MOVE_ORDER.
+    """
+    return [(i, j) for i, j in MOVE_ORDER if board[i][j] == EMPTY]
+
+
+def alpha_beta_max(board, alpha=-math.inf, beta=math.inf, stats=None):
+    """
+    Returns the value of a board with X to move, or a value no greater
+    than alpha if X cannot do better than alpha, or no less than beta
+    if O would avoid the board. Stops at the first winning move.
+    """
+    count_node(stats)
+    if terminal(board):
+        return utility(board)
+    v = -math.inf
+    for action in ordered_actions(board):
+        v = max(v, alpha_beta_min(result(board, action), alpha, beta, stats))
+        if v >= beta or v == 1:
+            return v
+        alpha = max(alpha, v)
+    return v
+
+
+def alpha_beta_min(board, alpha=-math.inf, beta=math.inf, stats=None):
+    """
+    Returns the value of a board with O to move, bounded like
+    alpha_beta_max. Stops at the first winning move.
+    """
+    count_node(stats)
+    if terminal(board):
+        return utility(board)
+    v = math.inf
+    for action in ordered_actions(board):
+        v = min(v, alpha_beta_max(result(board, action), alpha, beta, stats))
+        if v <= alpha or v == -1:
+            return v
+        beta = min(beta, v)
     return v
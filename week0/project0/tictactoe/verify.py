@@ -0,0 +1,176 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import book
+import engine
+import mnk
+import tictactoe as ttt
+
+
+def reachable_boards():
+    """
+    Returns every board reachable from the initial state, keyed by a
+    tuple of its cells.
+    """
+    boards = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = tuple(cell for row in board for cell in row)
+        if key in boards:
+            continue
+        boards[key] = board
+        if not ttt.terminal(board):
+            for action in ttt.actions(board):
+                stack.append(ttt.result(board, action))
+    return boards
+
+
+def check_alphabeta(args):
+    """
+    Checks that alpha-beta gives the same value as plain minimax for
+    every reachable position, and that minimax picks a move keeping
+    that value, then compares node counts from the empty board.
+    """
+    boards = reachable_boards()
+    print(f"{len(boards)} reachable positions", file=sys.stderr)
+
+    mismatches = 0
+    for board in boards.values():
+        if ttt.player(board) == ttt.X:
+            expected = ttt.max_value(board)
+            actual = ttt.alpha_beta_max(board)
+        else:
+            expected = ttt.min_value(board)
+            actual = ttt.alpha_beta_min(board)
+        move = ttt.minimax(board, search="alphabeta")
+        if move is not None:
+            after = ttt.result(board, move)
+            if ttt.player(after) == ttt.X:
+                kept = ttt.max_value(after) == expected
+            else:
+                kept = ttt.min_value(after) == expected
+        else:
+            kept = True
+        if actual != expected or not kept:
+            mismatches += 1
+            print(f"mismatch: {board}", file=sys.stderr)
+
+    board = ttt.initial_state()
+    print(f"{'search':<10} {'nodes':>8} {'seconds':>8}")
+    for search in ["plain", "alphabeta"]:
+        stats = {}
+        start = time.perf_counter()
+        ttt.minimax(board, search=search, stats=stats)
+        print(f"{search:<10} {stats['nodes']:>8} "
+              f"{time.perf_counter() - start:>8.3f}")
+    return mismatches == 0
+
+
+def check_book(args):
+    """
+    Regenerates the opening book and checks it matches the shipped file,
+    then checks every reachable position's book value and move against
+    the engine.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "opening.book")
+        start = time.perf_counter()
+        book.write_book(path, book.build())
+        print(f"Built book in {time.perf_counter() - start:.3f} seconds",
+              file=sys.stderr)
+        with open(path, "rb") as f:
+            built = f.read()
+    try:
+        with open(book.PATH, "rb") as f:
+            shipped = f.read()
+    except FileNotFoundError:
+        shipped = None
+    if built != shipped:
+        print(f"{book.PATH} is out of date; run book.py", file=sys.stderr)
+        return False
+
+    start = time.perf_counter()
+    entries = book.read_book()
+    print(f"Loaded {len(entries)} positions in "
+          f"{1000 * (time.perf_counter() - start):.2f} ms", file=sys.stderr)
+
+    boards = reachable_boards()
+    mismatches = 0
+    for board in boards.values():
+        x_mask, o_mask = engine.encode(board, ttt.X, ttt.O)
+        move, value = book.lookup(entries, x_mask, o_mask)
+        expected = engine.value(x_mask, o_mask)
+        if move is None:
+            kept = ttt.terminal(board)
+        else:
+            after = engine.play(x_mask, o_mask, move)
+            kept = engine.value(*after) == expected
+        if value != expected or not kept:
+            mismatches += 1
+            print(f"mismatch: {board}", file=sys.stderr)
+    print(f"{len(boards)} reachable positions checked", file=sys.stderr)
+    return mismatches == 0
+
+
+def check_mnk(args):
+    """
+    Checks that the m,n,k-game engine, set up as Tic Tac Toe, finds the
+    same value as the bitboard engine for every reachable position and
+    picks a move keeping it.
+    """
+    game = mnk.MNKGame(3, 3, 3)
+    boards = reachable_boards()
+    mismatches = 0
+    start = time.perf_counter()
+    for board in boards.values():
+        stats = {}
+        move = game.search(game.board(board), stats=stats)
+        if move is None:
+            if not ttt.terminal(board):
+                mismatches += 1
+                print(f"mismatch: {board}", file=sys.stderr)
+            continue
+
+        # Convert the value for the player to move into -1, 0 or 1 for X
+        value = stats["value"]
+        value = (value > mnk.WON) - (value < -mnk.WON)
+        if ttt.player(board) == ttt.O:
+            value = -value
+        x_mask, o_mask = engine.encode(board, ttt.X, ttt.O)
+        expected = engine.value(x_mask, o_mask)
+        after = engine.play(x_mask, o_mask, 3 * move[0] + move[1])
+        if value != expected or engine.value(*after) != expected:
+            mismatches += 1
+            print(f"mismatch: {board}", file=sys.stderr)
+    print(f"{len(boards)} reachable positions checked in "
+          f"{time.perf_counter() - start:.3f} seconds", file=sys.stderr)
+    return mismatches == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check tictactoe searches against each other"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser(
+        "alphabeta", help="compare alpha-beta with plain minimax"
+    ).set_defaults(check=check_alphabeta)
+    subparsers.add_parser(
+        "book", help="regenerate the opening book and check it"
+    ).set_defaults(check=check_book)
+    subparsers.add_parser(
+        "mnk", help="compare the m,n,k-game engine with the bitboard engine"
+    ).set_defaults(check=check_mnk)
+    args = parser.parse_args()
+
+    if not args.check(args):
+        sys.exit("Check failed.")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from generate import ALGORITHMS, generate
+from maze import CompactMaze, Maze, STRATEGIES
+
+# (name, maze class, strategy) for every solver the harness runs
+SOLVERS = (
+    [(f"maze-{strategy}", Maze, strategy) for strategy in STRATEGIES]
+    + [(f"compact-{strategy}", CompactMaze, strategy)
+       for strategy in STRATEGIES]
+)
+
+
+def run(filename, maze_class, strategy, memory):
+    """
+    Loads and solves one maze. Returns a dict of the states explored,
+    solution length, seconds taken and, with `memory`, peak bytes
+    allocated in a second, traced run.
+    """
+    start = time.perf_counter()
+    maze = maze_class(filename)
+    maze.solve(strategy)
+    result = {
+        "seconds": time.perf_counter() - start,
+        "explored": maze.num_explored,
+        "length": len(maze.solution[0]),
+    }
+    del maze
+
+    if memory:
+        tracemalloc.start()
+        maze_class(filename).solve(strategy)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def benchmark(mazes, limits, memory):
+    """
+    Runs every solver over (name, filename, cells) mazes and returns a
+    list of result dicts. Solvers are skipped on mazes with more cells
+    than their entry in `limits`.
+    """
+    results = []
+    for name, filename, cells in mazes:
+        for solver, maze_class, strategy in SOLVERS:
+            if cells > limits.get(solver, math.inf):
+                continue
+            print(f"{name}: {solver}", file=sys.stderr)
+            result = {"maze": name, "cells": cells, "solver": solver}
+            result.update(run(filename, maze_class, strategy, memory))
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maze solvers")
+    parser.add_argument("files", nargs="*",
+                        default=["maze1.txt", "maze2.txt", "maze3.txt"],
+                        help="maze files to include")
+    parser.add_argument("--sizes", type=int, nargs="*",
+                        default=[10 ** k for k in range(2, 8)],
+                        help="cell counts of generated square mazes")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS,
+                        default=ALGORITHMS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--maze-limit", type=int, default=10 ** 6,
+                        help="largest maze for the tuple-based Maze solvers")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced run measuring peak memory")
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    limits = {}
+    for strategy in STRATEGIES:
+        limits[f"maze-{strategy}"] = args.maze_limit
+
+    with tempfile.TemporaryDirectory() as directory:
+        mazes = []
+        for filename in args.files:
+            maze = CompactMaze(filename)
+            mazes.append((os.path.basename(filename), filename,
+                          maze.height * maze.width))
+        for cells in args.sizes:
+            side = max(math.isqrt(cells), 5)
+            for algorithm in args.algorithms:
+                name = f"{algorithm}-{side}"
+                filename = os.path.join(directory, f"{name}.txt")
+                text = generate(side, side, algorithm, args.seed)
+                with open(filename, "w") as f:
+                    f.write(text)
+                lines = text.splitlines()
+                mazes.append((name, filename, len(lines) * len(lines[0])))
+
+        report = {
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "results": benchmark(mazes, limits, not args.no_memory),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import random
+import sys
+
+# Maze generators accepted by generate
+ALGORITHMS = ["backtracker", "prim", "rooms"]
+
+
+def generate(height, width, algorithm="backtracker", seed=0):
+    """
+    Returns the text of a seeded maze in the format Maze reads: "#" for
+    walls, " " for open cells, "A" for the start and "B" for the goal.
+
+    "backtracker" and "prim" carve perfect mazes (exactly one path
+    between any two cells) on a grid of odd size, so even sizes are
+    rounded down. "rooms" splits an open area into rooms joined by
+    doorways, which leaves many paths.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm: {algorithm}")
+    rng = random.Random(seed)
+    if algorithm == "rooms":
+        grid = rooms(height, width, rng)
+    else:
+        height -= 1 - height % 2
+        width -= 1 - width % 2
+        grid = bytearray(b"#" * (height * width))
+        carve = backtracker if algorithm == "backtracker" else prim
+        carve(grid, height, width, rng)
+
+    # Start and goal go in the first and last open cells
+    grid[grid.index(b" ")] = ord("A")
+    grid[grid.rindex(b" ")] = ord("B")
+    return b"\n".join(
+        bytes(grid[i * width:(i + 1) * width]) for i in range(height)
+    ).decode() + "\n"
+
+
+def cell_neighbors(cell, height, width):
+    """Returns cells two steps away in each direction, inside the grid."""
+    row, col = divmod(cell, width)
+    result = []
+    if row >= 3:
+        result.append(cell - 2 * width)
+    if row + 2 < height - 1:
+        result.append(cell + 2 * width)
+    if col >= 3:
+        result.append(cell - 2)
+    if col + 2 < width - 1:
+        result.append(cell + 2)
+    return result
+
+
+def backtracker(grid, height, width, rng):
+    """Carves a maze with an iterative randomized depth-first search."""
+    start = width + 1
+    grid[start] = ord(" ")
+    stack = [start]
+    while stack:
+        cell = stack[-1]
+        options = [n for n in cell_neighbors(cell, height, width)
+                   if grid[n] == ord("#")]
+        if not options:
+            stack.pop()
+            continue
+        neighbor = rng.choice(options)
+        grid[(cell + neighbor) // 2] = ord(" ")
+        grid[neighbor] = ord(" ")
+        stack.append(neighbor)
+
+
+def prim(grid, height, width, rng):
+    """Carves a maze with randomized Prim's algorithm."""
+    start = width + 1
+    grid[start] = ord(" ")
+    walls = [(start, n) for n in cell_neighbors(start, height, width)]
+    while walls:
+        # Swap a random wall to the end so it can be popped in O(1)
+        i = rng.randrange(len(walls))
+        walls[i], walls[-1] = walls[-1], walls[i]
+        cell, neighbor = walls.pop()
+        if grid[neighbor] != ord("#"):
+            continue
+        grid[(cell + neighbor) // 2] = ord(" ")
+        grid[neighbor] = ord(" ")
+        for n in cell_neighbors(neighbor, height, width):
+            if grid[n] == ord("#"):
+                walls.append((neighbor, n))
+
+
+def rooms(height, width, rng, min_size=8):
+    """
+    Returns an open grid split by recursive division into rooms no
+    smaller than min_size, each wall pierced by one doorway.
+
+    Walls sit on even rows and columns and doorways on odd ones, so a
+    later wall can never block an earlier doorway.
+    """
+    grid = bytearray(b" " * (height * width))
+    stack = [(0, 0, height, width)]
+    while stack:
+        top, left, h, w = stack.pop()
+        if h >= w:
+            # Horizontal wall with a doorway
+            rows = range(top + min_size, top + h - min_size)
+            rows = [row for row in rows if row % 2 == 0]
+            doors = [col for col in range(left, left + w) if col % 2 == 1]
+            if not rows or not doors:
+                continue
+            row = rng.choice(rows)
+            door = rng.choice(doors)
+            for col in range(left, left + w):
+                if col != door:
+                    grid[row * width + col] = ord("#")
+            stack.append((top, left, row - top, w))
+            stack.append((row + 1, left, top + h - row - 1, w))
+        else:
+            # Vertical wall with a doorway
+            cols = range(left + min_size, left + w - min_size)
+            cols = [col for col in cols if col % 2 == 0]
+            doors = [row for row in range(top, top + h) if row % 2 == 1]
+            if not cols or not doors:
+                continue
+            col = rng.choice(cols)
+            door = rng.choice(doors)
+            for row in range(top, top + h):
+                if row != door:
+                    grid[row * width + col] = ord("#")
+            stack.append((top, left, h, col - left))
+            stack.append((top, col + 1, h, left + w - col - 1))
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a maze")
+    parser.add_argument("height", type=int)
+    parser.add_argument("width", type=int)
+    parser.add_argument("--algorithm", choices=ALGORITHMS,
+                        default="backtracker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="file to write instead of "
+                        "standard output")
+    args = parser.parse_args()
+
+    text = generate(args.height, args.width, args.algorithm, args.seed)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
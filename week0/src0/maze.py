@@ -1,4 +1,10 @@
-import sys
+import argparse
+import heapq
+import itertools
+import time
+
+from array import array
+from collections import deque
 
 class Node():
     def __init__(self, state, parent, action):
@@ -9,13 +15,17 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Counts how many nodes in the frontier hold each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,10 +34,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
             return node
 
+    def discard(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -35,10 +52,50 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
+            return node
+
+class HeapFrontier(StackFrontier):
+    """
+    Frontier that removes the node with the lowest priority first,
+    breaking ties by insertion order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self.discard(node.state)
             return node
 
+
+# Colors used by Maze.output_image, indexed by the constants below
+PALETTE = [
+    (0, 0, 0),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+    (237, 240, 252),
+]
+BLACK, WALL, START, GOAL, SOLUTION, EXPLORED, EMPTY = range(len(PALETTE))
+
+# Search strategies accepted by Maze.solve
+STRATEGIES = ["bfs", "dfs", "greedy", "astar"]
+
+
 class Maze():
 
     def __init__(self, filename):
@@ -82,7 +139,7 @@ class Maze():
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = set(self.solution[1]) if self.solution is not None else None
         print()
         for i, row in enumerate(self.walls):
             for j, col in enumerate(row):
@@ -116,16 +173,43 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def heuristic(self, state):
+        """Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists.
+
+        `strategy` is one of STRATEGIES: breadth-first, depth-first,
+        greedy best-first or A* search, the last two guided by Manhattan
+        distance. All of them order a HeapFrontier by a priority.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy: {strategy}")
+        started = time.perf_counter()
 
         # Keep track of number of states explored
         self.num_explored = 0
 
+        # Number of steps from the start to each state reached
+        cost = {self.start: 0}
+        order = itertools.count()
+
+        def priority(state):
+            if strategy == "bfs":
+                return next(order)
+            if strategy == "dfs":
+                return -next(order)
+            if strategy == "greedy":
+                return self.heuristic(state)
+            return cost[state] + self.heuristic(state)
+
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
-        frontier.add(start)
+        frontier = HeapFrontier()
+        frontier.add(start, priority(self.start))
 
         # Initialize an empty explored set
         self.explored = set()
@@ -135,10 +219,16 @@ class Maze():
 
             # If nothing left in frontier, then no path
             if frontier.empty():
+                self.elapsed = time.perf_counter() - started
                 raise Exception("no solution")
 
             # Choose a node from the frontier
             node = frontier.remove()
+
+            # A* may have queued a state again after finding a shorter
+            # route to it; skip the stale copy
+            if node.state in self.explored:
+                continue
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
@@ -152,6 +242,7 @@ class Maze():
                 actions.reverse()
                 cells.reverse()
                 self.solution = (actions, cells)
+                self.elapsed = time.perf_counter() - started
                 return
 
             # Mark node as explored
@@ -159,71 +250,321 @@ class Maze():
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+                if state in self.explored:
+                    continue
+                step_cost = cost[node.state] + 1
+                if frontier.contains_state(state):
+                    if strategy != "astar" or step_cost >= cost[state]:
+                        continue
+                cost[state] = step_cost
+                child = Node(state=state, parent=node, action=action)
+                frontier.add(child, priority(state))
+
+
+    def cell_colors(self, show_solution=True, show_explored=False):
+        """
+        Returns a bytearray with one PALETTE index per cell, row by row.
+        """
+        solution = set(self.solution[1]) if self.solution is not None else set()
+        explored = self.explored if self.solution is not None else set()
+        colors = bytearray()
+        for i, row in enumerate(self.walls):
+            for j, col in enumerate(row):
+                if col:
+                    colors.append(WALL)
+                elif (i, j) == self.start:
+                    colors.append(START)
+                elif (i, j) == self.goal:
+                    colors.append(GOAL)
+                elif show_solution and (i, j) in solution:
+                    colors.append(SOLUTION)
+                elif show_explored and (i, j) in explored:
+                    colors.append(EXPLORED)
+                else:
+                    colors.append(EMPTY)
+        return colors
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, max_size=None):
+        """
+        Saves the maze as an image with one cell_size square per cell.
+
+        The image is assembled from rows of palette indices in one pass
+        rather than drawn cell by cell. With `max_size`, cells shrink so
+        neither side exceeds max_size pixels, down to one pixel per cell
+        and then by resampling, which gives quick previews of huge mazes.
+        """
+        from PIL import Image
+
+        if max_size is not None:
+            cell_size = min(cell_size, max_size // max(self.width, self.height))
+            cell_size = max(cell_size, 1)
+
+        # Each cell is colored from cell_border up to cell_size - cell_border
+        # inclusive, on a black canvas; tiny cells get no border
+        cell_border = 2 if cell_size >= 10 else 0
+        if cell_border:
+            inner = cell_size - 2 * cell_border + 1
+            tiles = [
+                bytes([BLACK] * cell_border + [color] * inner
+                      + [BLACK] * (cell_border - 1))
+                for color in range(len(PALETTE))
+            ]
+        else:
+            tiles = [bytes([color]) * cell_size
+                     for color in range(len(PALETTE))]
 
+        colors = self.cell_colors(show_solution, show_explored)
+        width = self.width * cell_size
+        border_row = bytes([BLACK]) * width
+        rows = []
+        for i in range(self.height):
+            row = b"".join(
+                tiles[color]
+                for color in colors[i * self.width:(i + 1) * self.width]
+            )
+            if cell_border:
+                rows.append(border_row * cell_border)
+                rows.append(row * inner)
+                rows.append(border_row * (cell_border - 1))
+            else:
+                rows.append(row * cell_size)
+
+        img = Image.frombytes("P", (width, self.height * cell_size),
+                              b"".join(rows))
+        img.putpalette([channel for color in PALETTE for channel in color])
+        img = img.convert("RGBA")
+
+        if max_size is not None and max(img.size) > max_size:
+            scale = max_size / max(img.size)
+            img = img.resize((max(1, int(img.width * scale)),
+                              max(1, int(img.height * scale))), Image.BOX)
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
+        img.save(filename)
 
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+class CompactMaze(Maze):
+    """
+    Maze stored as a flat bytearray of open cells, indexed by integer
+    cell ids (row * width + col).
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+    Its solve gives the same solutions and explored states as
+    Maze.solve for every strategy, but works on integers and flat
+    arrays instead of tuples, Nodes and sets.
+    """
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+    def __init__(self, filename):
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        # Read file as bytes so rows can be translated in bulk
+        with open(filename, "rb") as f:
+            contents = f.read()
+
+        # Validate start and goal
+        if contents.count(b"A") != 1:
+            raise Exception("maze must have exactly one start point")
+        if contents.count(b"B") != 1:
+            raise Exception("maze must have exactly one goal")
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+        # Determine height and width of maze
+        lines = contents.splitlines()
+        self.height = len(lines)
+        self.width = max(len(line) for line in lines)
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+        # 1 for open cells, 0 for walls; short lines are padded as open
+        table = bytes(1 if chr(c) in " AB" else 0 for c in range(256))
+        self.open = bytearray(b"".join(
+            line.ljust(self.width).translate(table) for line in lines
+        ))
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+        start = b"".join(line.ljust(self.width) for line in lines)
+        self.start = divmod(start.index(b"A"), self.width)
+        self.goal = divmod(start.index(b"B"), self.width)
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+        self.solution = None
+        self.explored_cells = bytearray(len(self.open))
+
+    @property
+    def walls(self):
+        """Rows of wall flags, built on demand for printing."""
+        w = self.width
+        return [[not cell for cell in self.open[i * w:(i + 1) * w]]
+                for i in range(self.height)]
+
+    @property
+    def explored(self):
+        """Set of (row, col) states explored by the last solve."""
+        w = self.width
+        cells = self.explored_cells
+        return {divmod(i, w) for i in range(len(cells)) if cells[i]}
+
+    def cell_colors(self, show_solution=True, show_explored=False):
+        """
+        Returns a bytearray with one PALETTE index per cell, row by row,
+        built from the flat arrays instead of per-cell lookups.
+        """
+        w = self.width
+        colors = self.open.translate(
+            bytes([WALL, EMPTY]) + bytes(254)
+        )
+        if self.solution is not None:
+            if show_explored:
+                cells = self.explored_cells
+                i = cells.find(1)
+                while i != -1:
+                    colors[i] = EXPLORED
+                    i = cells.find(1, i + 1)
+            if show_solution:
+                for row, col in self.solution[1]:
+                    colors[row * w + col] = SOLUTION
+        colors[self.start[0] * w + self.start[1]] = START
+        colors[self.goal[0] * w + self.goal[1]] = GOAL
+        return colors
 
-        img.save(filename)
+    def neighbors(self, state):
+        row, col = state
+        w = self.width
+        result = []
+        for action, cell in self.cell_neighbors(row * w + col):
+            result.append((action, divmod(cell, w)))
+        return result
+
+    def cell_neighbors(self, cell):
+        """Returns (action, cell) pairs in the same order as neighbors."""
+        w = self.width
+        is_open = self.open
+        col = cell % w
+        result = []
+        if cell >= w and is_open[cell - w]:
+            result.append(("up", cell - w))
+        if cell + w < len(is_open) and is_open[cell + w]:
+            result.append(("down", cell + w))
+        if col > 0 and is_open[cell - 1]:
+            result.append(("left", cell - 1))
+        if col < w - 1 and is_open[cell + 1]:
+            result.append(("right", cell + 1))
+        return result
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy: {strategy}")
+        started = time.perf_counter()
+
+        w = self.width
+        size = len(self.open)
+        start = self.start[0] * w + self.start[1]
+        goal = self.goal[0] * w + self.goal[1]
+        goal_row, goal_col = self.goal
+
+        # Per-cell search state, -1/0 meaning unset
+        parent = array("i", [-1]) * size
+        cost = array("i", [0]) * size
+        in_frontier = array("H", [0]) * size
+        explored = self.explored_cells = bytearray(size)
+        self.num_explored = 0
+
+        # BFS and DFS take cells in FIFO and LIFO order, exactly like the
+        # insertion-order priorities of Maze.solve; the informed
+        # strategies use the same (priority, insertion order) heap keys
+        if strategy in ("bfs", "dfs"):
+            frontier = deque([start])
+            take = frontier.popleft if strategy == "bfs" else frontier.pop
+        else:
+            frontier = [(0, 0, start)]
+            counter = itertools.count(1)
+        in_frontier[start] = 1
 
+        while True:
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+            # If nothing left in frontier, then no path
+            if not frontier:
+                self.elapsed = time.perf_counter() - started
+                raise Exception("no solution")
+
+            # Choose a cell from the frontier
+            if strategy in ("bfs", "dfs"):
+                cell = take()
+            else:
+                cell = heapq.heappop(frontier)[2]
+            in_frontier[cell] -= 1
+            if explored[cell]:
+                continue
+            self.num_explored += 1
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+            # If cell is the goal, then we have a solution
+            if cell == goal:
+                self.solution = self.trace(parent, start, goal)
+                self.elapsed = time.perf_counter() - started
+                return
+
+            # Mark cell as explored
+            explored[cell] = 1
+
+            # Add neighbors to frontier
+            step_cost = cost[cell] + 1
+            for _, neighbor in self.cell_neighbors(cell):
+                if explored[neighbor]:
+                    continue
+                if in_frontier[neighbor]:
+                    if strategy != "astar" or step_cost >= cost[neighbor]:
+                        continue
+                cost[neighbor] = step_cost
+                parent[neighbor] = cell
+                in_frontier[neighbor] += 1
+                if strategy in ("bfs", "dfs"):
+                    frontier.append(neighbor)
+                    continue
+                row, col = divmod(neighbor, w)
+                priority = abs(row - goal_row) + abs(col - goal_col)
+                if strategy == "astar":
+                    priority += step_cost
+                heapq.heappush(frontier, (priority, next(counter), neighbor))
+
+    def trace(self, parent, start, goal):
+        """Returns (actions, cells) following parent links to goal."""
+        w = self.width
+        actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            previous = parent[cell]
+            if previous == cell - w:
+                actions.append("down")
+            elif previous == cell + w:
+                actions.append("up")
+            elif previous == cell - 1:
+                actions.append("right")
+            else:
+                actions.append("left")
+            cells.append(divmod(cell, w))
+            cell = previous
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a maze")
+    parser.add_argument("maze", help="maze text file")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="dfs")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the grid as a flat array of cells")
+    args = parser.parse_args()
+
+    m = CompactMaze(args.maze) if args.compact else Maze(args.maze)
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(args.strategy)
+    print("States Explored:", m.num_explored)
+    print(f"Time: {m.elapsed:.4f}s")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
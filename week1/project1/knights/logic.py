@@ -7,6 +7,15 @@ class Sentence():
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def truth_table(self, columns, full):
+        """
+        Evaluates the logical sentence in every model at once. columns
+        maps each symbol to a bitset of the models it is true in, and
+        full has a bit set for every model. Returns the bitset of
+        models the sentence is true in.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -62,6 +71,12 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def truth_table(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
@@ -86,6 +101,9 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def truth_table(self, columns, full):
+        return full ^ self.operand.truth_table(columns, full)
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
@@ -120,6 +138,14 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def truth_table(self, columns, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result &= conjunct.truth_table(columns, full)
+            if not result:
+                break
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -151,6 +177,14 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def truth_table(self, columns, full):
+        result = 0
+        for disjunct in self.disjuncts:
+            result |= disjunct.truth_table(columns, full)
+            if result == full:
+                break
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -183,6 +217,10 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def truth_table(self, columns, full):
+        return ((full ^ self.antecedent.truth_table(columns, full))
+                | self.consequent.truth_table(columns, full))
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
@@ -216,6 +254,10 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def truth_table(self, columns, full):
+        return full ^ (self.left.truth_table(columns, full)
+                       ^ self.right.truth_table(columns, full))
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
@@ -261,3 +303,475 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def truth_columns(symbols):
+    """
+    Returns (columns, full) for the truth table over symbols: bit m of
+    a symbol's column is set if the symbol is true in model m, and full
+    has all 2 ** len(symbols) bits set.
+
+    Each column is built by doubling a repeating pattern, and takes
+    2 ** len(symbols) bits, so 26 symbols need 8 MB per column.
+    """
+    size = 1 << len(symbols)
+    columns = {}
+    for i, symbol in enumerate(sorted(symbols)):
+        # Blocks of 2 ** i false models then 2 ** i true models
+        width = 1 << i
+        column = ((1 << width) - 1) << width
+        length = 2 * width
+        while length < size:
+            column |= column << length
+            length *= 2
+        columns[symbol] = column
+    return columns, (1 << size) - 1
+
+
+def truth_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating both over the
+    whole truth table at once, as bitsets. A drop-in replacement for
+    model_check.
+    """
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    columns, full = truth_columns(symbols)
+    knowledge = knowledge.truth_table(columns, full)
+    return not knowledge & (full ^ query.truth_table(columns, full))
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form over integer variables, numbered
+    from 1, with a negative integer standing for a negated variable.
+
+    Sentences are added with Tseitin's encoding: every compound
+    subformula that is not asserted directly gets a fresh variable
+    defined to be equivalent to it, so the clauses grow linearly with
+    the size of the sentence instead of exponentially.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.clauses = []
+        self.count = 0
+        self.literals = {}
+
+    def variable(self, name=None):
+        """
+        Returns the variable of a symbol name, or a fresh variable.
+        """
+        if name is None or name not in self.variables:
+            self.count += 1
+            if name is None:
+                return self.count
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to sentence, adding clauses that
+        define any fresh variable it needs.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            operands = [self.literal(c) for c in sentence.conjuncts]
+            v = self.variable()
+            self.clauses.append([v] + [-o for o in operands])
+            for o in operands:
+                self.clauses.append([-v, o])
+        elif isinstance(sentence, Or):
+            operands = [self.literal(d) for d in sentence.disjuncts]
+            v = self.variable()
+            self.clauses.append([-v] + operands)
+            for o in operands:
+                self.clauses.append([v, -o])
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            v = self.variable()
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.variable()
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError("must be a logical sentence")
+
+        self.literals[sentence] = v
+        return v
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true, and
+        returns them. Conjunctions, disjunctions and implications are
+        asserted directly; only their compound operands need Tseitin
+        variables.
+        """
+        start = len(self.clauses)
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        elif isinstance(sentence, Not) and isinstance(sentence.operand, Or):
+            for disjunct in sentence.operand.disjuncts:
+                self.clauses.append([-self.literal(disjunct)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+        return self.clauses[start:]
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Unit propagation watches two literals per clause. Each conflict
+    adds a learned clause at the first unique implication point and
+    backjumps to the level where that clause becomes unit. Decisions
+    pick the unassigned variable most involved in recent conflicts,
+    with its last value. Clauses can be added between calls to solve,
+    and solve can assume literals for one call only.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.watches = {}
+
+        # Per variable, indexed from 1: value (1, -1 or 0 if unassigned),
+        # decision level, index of the clause that implied it, activity
+        # and the last value it took
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [-1]
+
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+
+        self.decisions = 0
+        self.conflicts = 0
+        self.propagations = 0
+
+    def reserve(self, num_vars):
+        """Makes room for variables up to num_vars."""
+        while self.num_vars < num_vars:
+            self.num_vars += 1
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(-1)
+            self.watches[self.num_vars] = []
+            self.watches[-self.num_vars] = []
+
+    def value(self, literal):
+        """Returns 1 if literal is true, -1 if false, 0 if unassigned."""
+        v = self.values[abs(literal)]
+        return v if literal > 0 else -v
+
+    def assign(self, literal, reason):
+        var = abs(literal)
+        self.values[var] = 1 if literal > 0 else -1
+        self.levels[var] = len(self.trail_lim)
+        self.reasons[var] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level):
+        """Undoes every assignment above decision level `level`."""
+        if len(self.trail_lim) <= level:
+            return
+        for literal in self.trail[self.trail_lim[level]:]:
+            var = abs(literal)
+            self.phases[var] = self.values[var]
+            self.values[var] = 0
+            self.reasons[var] = None
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def add_clause(self, clause):
+        """
+        Adds a clause, a list of literals. Returns False if the clauses
+        are now unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        self.reserve(max((abs(literal) for literal in clause), default=0))
+
+        literals = []
+        for literal in clause:
+            value = self.value(literal)
+            if value == 1 or -literal in literals:
+                return True
+            if value == 0 and literal not in literals:
+                literals.append(literal)
+
+        if not literals:
+            self.ok = False
+        elif len(literals) == 1:
+            self.assign(literals[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watch(literals)
+        return self.ok
+
+    def watch(self, literals):
+        """Stores a clause watching its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(literals)
+        self.watches[literals[0]].append(index)
+        self.watches[literals[1]].append(index)
+        return index
+
+    def propagate(self):
+        """
+        Assigns literals forced by unit clauses until none are left.
+        Returns the index of a clause made false, or None.
+        """
+        clauses = self.clauses
+        while self.qhead < len(self.trail):
+            false_literal = -self.trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watching = self.watches[false_literal]
+            kept = []
+            for position, index in enumerate(watching):
+                clause = clauses[index]
+
+                # Keep the false literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                if self.value(clause[0]) == 1:
+                    kept.append(index)
+                    continue
+
+                # Watch another literal that is not false
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], false_literal
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) == -1:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, level to backjump to) for a conflict.
+        The learned clause's first literal is the one it will imply.
+        """
+        level = len(self.trail_lim)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if literal is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.levels[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.levels[var] == level:
+                        pending += 1
+                    else:
+                        learned.append(q)
+
+            # Resolve with the reason of the latest literal involved
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            seen.discard(abs(literal))
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the highest remaining level second
+        k = max(range(1, len(learned)),
+                key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[k] = learned[k], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, var):
+        self.activity[var] += self.increment
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and assumed literals can all be
+        true at once, storing a satisfying model as {variable: bool}.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        self.reserve(max((abs(literal) for literal in assumptions),
+                         default=0))
+
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.watch(learned))
+                self.increment /= 0.95
+                continue
+
+            # Assumptions are decided first, one level each
+            level = len(self.trail_lim)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            var = 0
+            best = -1.0
+            for v in range(1, self.num_vars + 1):
+                if self.values[v] == 0 and self.activity[v] > best:
+                    var = v
+                    best = self.activity[v]
+            if not var:
+                self.model = {
+                    v: self.values[v] == 1 for v in range(1, self.num_vars + 1)
+                }
+                self.backtrack(0)
+                return True
+
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(var if self.phases[var] == 1 else -var, None)
+
+
+class KnowledgeBase():
+    """
+    Knowledge compiled once into a SAT solver, for answering many
+    entailment queries.
+
+    Each query is decided by solving with its negation assumed, so the
+    solver keeps its clauses and everything it has learned between
+    queries. Sentences added later are compiled on their own, like
+    And.add, without recompiling the rest. With `check`, a function
+    like model_check, queries are passed to it instead.
+    """
+
+    def __init__(self, knowledge=None, check=None):
+        self.knowledge = And()
+        self.check = check
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.compiled = 0
+        if knowledge is not None:
+            self.add(knowledge)
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base."""
+        self.knowledge.add(sentence)
+        if self.check is None:
+            self.cnf.add(sentence)
+            self.compile()
+
+    def compile(self):
+        """Passes variables and clauses the solver has not seen to it."""
+        self.solver.reserve(self.cnf.count)
+        for clause in self.cnf.clauses[self.compiled:]:
+            self.solver.add_clause(clause)
+        self.compiled = len(self.cnf.clauses)
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        if self.check is not None:
+            return self.check(self.knowledge, query)
+        literal = self.cnf.literal(query)
+        self.compile()
+        return not self.solver.solve([-literal])
+
+    def entailed(self, queries):
+        """
+        Returns the queries the knowledge base entails, in order.
+
+        A model found while checking one query also shows that every
+        query false in it is not entailed, so those are not checked.
+        """
+        if self.check is not None:
+            return [query for query in queries
+                    if self.check(self.knowledge, query)]
+        literals = [self.cnf.literal(query) for query in queries]
+        self.compile()
+
+        undecided = set(range(len(queries)))
+        entailed = []
+        for i, literal in enumerate(literals):
+            if i not in undecided:
+                continue
+            if self.solver.solve([-literal]):
+                model = self.solver.model
+                undecided = {
+                    j for j in undecided
+                    if model[abs(literals[j])] == (literals[j] > 0)
+                }
+            else:
+                entailed.append(queries[i])
+        return entailed
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing that knowledge
+    and the negation of query cannot both be true. A drop-in
+    replacement for model_check.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = Solver()
+    for clause in cnf.clauses:
+        if not solver.add_clause(clause):
+            return True
+    return not solver.solve()
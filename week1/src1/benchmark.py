@@ -0,0 +1,117 @@
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import io
+import os
+import runpy
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (name, path) of each script benchmarked
+SCRIPTS = [
+    ("clue", os.path.join(HERE, "clue.py")),
+    ("mastermind", os.path.join(HERE, "mastermind.py")),
+    ("knights", os.path.join(HERE, "..", "project1", "knights", "puzzle.py")),
+]
+
+# Functions of logic.py that can stand in for model_check, and
+# "knowledge_base" for queries answered by a compiled KnowledgeBase
+CHECKERS = ["model_check", "truth_check", "sat_check", "knowledge_base"]
+
+
+def run_script(path, checker):
+    """
+    Runs a script with `checker` from the logic.py next to it in place
+    of model_check, and with every KnowledgeBase passing its queries to
+    that checker. With "knowledge_base", KnowledgeBase answers its own
+    queries and sat_check stands in for model_check.
+
+    Returns (seconds, queries, output).
+    """
+    directory = os.path.dirname(path)
+    sys.path.insert(0, directory)
+    sys.modules.pop("logic", None)
+    try:
+        logic = importlib.import_module("logic")
+        check = getattr(logic, checker, logic.sat_check)
+        queries = 0
+
+        def counted(knowledge, query):
+            nonlocal queries
+            queries += 1
+            return check(knowledge, query)
+        logic.model_check = counted
+
+        class KnowledgeBase(logic.KnowledgeBase):
+            def __init__(self, knowledge=None):
+                if checker == "knowledge_base":
+                    super().__init__(knowledge)
+                else:
+                    super().__init__(knowledge, check=counted)
+
+            def entails(self, query):
+                nonlocal queries
+                if self.check is None:
+                    queries += 1
+                return super().entails(query)
+
+            def entailed(self, batch):
+                nonlocal queries
+                if self.check is None:
+                    queries += len(batch)
+                return super().entailed(batch)
+        logic.KnowledgeBase = KnowledgeBase
+
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            runpy.run_path(path, run_name="__main__")
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop("logic", None)
+    return elapsed, queries, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark entailment checkers on the example scripts"
+    )
+    parser.add_argument("--checkers", nargs="+", choices=CHECKERS,
+                        default=CHECKERS)
+    parser.add_argument("--scripts", nargs="+",
+                        choices=[name for name, _ in SCRIPTS],
+                        default=[name for name, _ in SCRIPTS])
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per script and checker; the best is kept")
+    args = parser.parse_args()
+
+    print(f"{'script':<12}{'checker':<14}{'queries':>8}{'seconds':>10}"
+          f"{'speedup':>9}  output")
+    for name, path in SCRIPTS:
+        if name not in args.scripts:
+            continue
+        if name == "clue" and importlib.util.find_spec("termcolor") is None:
+            print(f"{name:<12}skipped: termcolor is not installed")
+            continue
+
+        baseline = None
+        expected = None
+        for checker in args.checkers:
+            best = None
+            for _ in range(args.repeat):
+                elapsed, queries, output = run_script(path, checker)
+                best = elapsed if best is None else min(best, elapsed)
+            if baseline is None:
+                baseline = best
+                expected = output
+            same = "same" if output == expected else "DIFFERENT"
+            print(f"{name:<12}{checker:<14}{queries:>8}{best:>10.4f}"
+                  f"{baseline / best:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,10 +21,13 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
+    kb = KnowledgeBase(knowledge)
+    yes = kb.entailed(symbols)
+    no = kb.entailed([Not(symbol) for symbol in symbols])
     for symbol in symbols:
-        if model_check(knowledge, symbol):
+        if symbol in yes:
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif Not(symbol) not in no:
             print(f"{symbol}: MAYBE")
 
 